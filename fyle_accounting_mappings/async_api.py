@@ -0,0 +1,323 @@
+"""
+Native asyncio counterparts of the attribute sync and mapping APIs, built on psycopg's AsyncConnection
+so syncs and lookups of many workspaces can interleave on one event loop.
+
+async with await get_async_connection() as connection:
+    await abulk_upsert_expense_attributes(attributes, 'PROJECT', workspace_id, connection=connection)
+"""
+import inspect
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import DestinationAttribute, ExpenseAttribute, Mapping, get_match_key
+from .upsert import build_upsert_statement, get_conflict_fields, get_unique_attributes, iterate_windows
+from .utils import assert_valid
+
+try:
+    from psycopg import AsyncConnection
+except ImportError:
+    AsyncConnection = None
+
+logger = logging.getLogger(__name__)
+
+
+async def get_async_connection(alias: str = 'default'):
+    """
+    Open an async connection with the settings of a django database
+    :param alias: Database alias
+    :return: psycopg AsyncConnection
+    """
+    assert_valid(AsyncConnection is not None, 'psycopg 3 is required for the async APIs')
+
+    database = settings.DATABASES[alias]
+    params = {
+        'dbname': database.get('NAME'),
+        'user': database.get('USER'),
+        'password': database.get('PASSWORD'),
+        'host': database.get('HOST'),
+        'port': database.get('PORT')
+    }
+    params = {key: value for key, value in params.items() if value}
+    params.update(database.get('OPTIONS', {}))
+
+    return await AsyncConnection.connect(**params)
+
+
+@asynccontextmanager
+async def atomic(connection=None):
+    """
+    Run a block in a transaction of the given connection, or of a new connection closed afterwards
+    :param connection: psycopg AsyncConnection
+    :return: connection
+    """
+    if connection is not None:
+        async with connection.transaction():
+            yield connection
+    else:
+        async with await get_async_connection() as new_connection:
+            async with new_connection.transaction():
+                yield new_connection
+
+
+async def abulk_upsert(connection, model, rows: List[Dict], update_fields: List[str], update: bool = True,
+                       conflict_fields: List[str] = None, change_fields: List[str] = None,
+                       batch_size: int = 1000) -> Dict[str, List[int]]:
+    """
+    Async bulk_upsert, one INSERT ... ON CONFLICT statement per batch
+    :param connection: psycopg AsyncConnection
+    :param model: Django model class
+    :param rows: rows = [{<field name>: <value>}], every row having the same keys
+    :param update_fields: Field names to overwrite on conflict when they changed
+    :param update: Update pre-existing records or leave them untouched
+    :param conflict_fields: Field names to conflict on, defaults to the model's unique_together
+    :param change_fields: Field names compared to decide whether a row changed, defaults to update_fields
+    :param batch_size: Rows per statement
+    :return: {'created_ids': [...], 'updated_ids': [...]}
+    """
+    conflict_fields = conflict_fields or get_conflict_fields(model)
+    created_ids = []
+    updated_ids = []
+
+    async with connection.cursor() as cursor:
+        for batch in iterate_windows(rows, batch_size):
+            sql, params = build_upsert_statement(model, batch, conflict_fields, update_fields, update, change_fields)
+            await cursor.execute(sql, params)
+
+            for primary_key, created in await cursor.fetchall():
+                if created:
+                    created_ids.append(primary_key)
+                else:
+                    updated_ids.append(primary_key)
+
+    return {
+        'created_ids': created_ids,
+        'updated_ids': updated_ids
+    }
+
+
+async def abulk_upsert_expense_attributes(attributes: List[Dict], attribute_type: str, workspace_id: int,
+                                          update: bool = False, connection=None) -> Dict[str, List[int]]:
+    """
+    Async ExpenseAttribute.bulk_upsert_expense_attributes
+    :param attributes: Attribute dicts, same shape as bulk_upsert_expense_attributes
+    :param attribute_type: Attribute type
+    :param workspace_id: Workspace Id
+    :param update: Update Pre-existing records or not
+    :param connection: psycopg AsyncConnection, a new one is used when not given
+    :return: {'created_ids': [...], 'updated_ids': [...]}
+    """
+    rows = ExpenseAttribute.construct_upsert_rows(attributes, attribute_type, workspace_id, update)
+
+    async with atomic(connection) as connection:
+        return await abulk_upsert(
+            connection, ExpenseAttribute, rows, update_fields=['source_id', 'detail', 'active', 'fingerprint'],
+            update=update, change_fields=['fingerprint']
+        )
+
+
+async def abulk_upsert_destination_attributes(
+        attributes: List[Dict],
+        attribute_type: str,
+        workspace_id: int,
+        update: bool = False,
+        display_name: str = None,
+        attribute_disable_callback_path: str = None,
+        is_import_to_fyle_enabled: bool = False,
+        connection=None
+) -> Dict[str, List[int]]:
+    """
+    Async DestinationAttribute.bulk_upsert_destination_attributes.
+    A coroutine disable callback is awaited, a regular one runs in a worker thread.
+    :param attributes: Attribute dicts, same shape as bulk_upsert_destination_attributes
+    :param attribute_type: Attribute type
+    :param workspace_id: Workspace Id
+    :param update: Update Pre-existing records or not
+    :param display_name: Display name to restrict the attributes to
+    :param attribute_disable_callback_path: API func to call when attribute is to be disabled
+    :param is_import_to_fyle_enabled: Import to fyle enabled or not
+    :param connection: psycopg AsyncConnection, a new one is used when not given
+    :return: {'created_ids': [...], 'updated_ids': [...]}
+    """
+    unique_attributes = get_unique_attributes(attributes, 'destination_id', update)
+
+    async with atomic(connection) as connection:
+        if attribute_disable_callback_path and is_import_to_fyle_enabled:
+            sql = 'SELECT destination_id, value, code FROM destination_attributes ' \
+                'WHERE destination_id = ANY(%s) AND attribute_type = %s AND workspace_id = %s'
+            params = [list(unique_attributes.keys()), attribute_type, workspace_id]
+            if display_name:
+                sql += ' AND display_name = %s'
+                params.append(display_name)
+
+            async with connection.cursor() as cursor:
+                await cursor.execute(sql, params)
+                existing_attributes = [
+                    {'destination_id': destination_id, 'value': value, 'code': code}
+                    for destination_id, value, code in await cursor.fetchall()
+                ]
+
+            attributes_to_disable = DestinationAttribute.get_attributes_to_disable(
+                unique_attributes, existing_attributes)
+
+            if attributes_to_disable:
+                callback = import_string(attribute_disable_callback_path)
+                if not inspect.iscoroutinefunction(callback):
+                    callback = sync_to_async(callback)
+                await callback(workspace_id, attributes_to_disable, is_import_to_fyle_enabled)
+
+        rows = DestinationAttribute.construct_upsert_rows(unique_attributes.values(), attribute_type, workspace_id)
+
+        return await abulk_upsert(
+            connection, DestinationAttribute, rows,
+            update_fields=['value', 'detail', 'active', 'code', 'match_key', 'fingerprint'],
+            update=update, change_fields=['fingerprint']
+        )
+
+
+async def acreate_or_update_mapping(source_type: str, destination_type: str, source_value: str,
+                                    destination_value: str, destination_id: str, workspace_id: int,
+                                    connection=None) -> Mapping:
+    """
+    Async Mapping.create_or_update_mapping
+    :param source_type: Type of Source attribute, eg. CATEGORY
+    :param destination_type: Type of Destination attribute, eg. ACCOUNT
+    :param source_value: Source value to be mapped, eg. category name
+    :param destination_value: Destination value to be mapped, eg. account name
+    :param destination_id: Destination Id of the destination attribute
+    :param workspace_id: Workspace Id
+    :param connection: psycopg AsyncConnection, a new one is used when not given
+    :return: unsaved mapping instance carrying the mapping id
+    """
+    async with atomic(connection) as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(
+                'SELECT 1 FROM mapping_settings WHERE source_field = %s AND destination_field = %s '
+                'AND workspace_id = %s LIMIT 1',
+                [source_type, destination_type, workspace_id]
+            )
+            assert_valid(
+                await cursor.fetchone() is not None,
+                'Settings for Destination  {0} / Source {1} not found'.format(destination_type, source_type)
+            )
+
+            source_id = None
+            if source_value:
+                await cursor.execute(
+                    'SELECT id FROM expense_attributes WHERE attribute_type = %s AND match_key = %s '
+                    'AND workspace_id = %s ORDER BY id LIMIT 1',
+                    [source_type, get_match_key(source_value), workspace_id]
+                )
+                row = await cursor.fetchone()
+                source_id = row[0] if row else None
+
+            await cursor.execute(
+                'SELECT id FROM destination_attributes WHERE attribute_type = %s AND value = %s '
+                'AND destination_id = %s AND workspace_id = %s',
+                [destination_type, destination_value, destination_id, workspace_id]
+            )
+            destination_rows = await cursor.fetchall()
+            if not destination_rows:
+                raise DestinationAttribute.DoesNotExist('DestinationAttribute matching query does not exist.')
+            if len(destination_rows) > 1:
+                raise DestinationAttribute.MultipleObjectsReturned(
+                    'get() returned more than one DestinationAttribute')
+
+        mapping = {
+            'source_type': source_type,
+            'source': source_id,
+            'destination_type': destination_type,
+            'destination': destination_rows[0][0],
+            'workspace': workspace_id
+        }
+        result = await abulk_upsert(connection, Mapping, [mapping], update_fields=['destination'])
+        mapping_ids = result['created_ids'] + result['updated_ids']
+
+        # An unchanged mapping is skipped by the upsert and returns no row
+        if not mapping_ids:
+            async with connection.cursor() as cursor:
+                await cursor.execute(
+                    'SELECT id FROM mappings WHERE source_type = %s AND source_id = %s '
+                    'AND destination_type = %s AND workspace_id = %s',
+                    [source_type, source_id, destination_type, workspace_id]
+                )
+                mapping_ids = [row[0] for row in await cursor.fetchall()]
+
+    return Mapping(
+        id=mapping_ids[0] if mapping_ids else None,
+        source_type=source_type,
+        source_id=source_id,
+        destination_type=destination_type,
+        destination_id=destination_rows[0][0],
+        workspace_id=workspace_id
+    )
+
+
+async def abulk_create_mappings(destination_attributes: List[DestinationAttribute], source_type: str,
+                                destination_type: str, workspace_id: int, set_auto_mapped_flag: bool = True,
+                                connection=None) -> List[Mapping]:
+    """
+    Async Mapping.bulk_create_mappings
+    :param destination_attributes: Destination Attributes List
+    :param source_type: Source Type
+    :param destination_type: Destination Type
+    :param workspace_id: Workspace Id
+    :param set_auto_mapped_flag: set auto mapped to expense attributes
+    :param connection: psycopg AsyncConnection, a new one is used when not given
+    :return: unsaved mapping instances carrying the mapping ids
+    """
+    destination_value_id_map = {
+        get_match_key(destination_attribute.value): destination_attribute.id
+        for destination_attribute in destination_attributes
+    }
+    if not destination_value_id_map:
+        return []
+
+    async with atomic(connection) as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(
+                'SELECT ea.id, ea.match_key FROM expense_attributes ea '
+                'WHERE ea.workspace_id = %s AND ea.attribute_type = %s AND ea.match_key = ANY(%s) '
+                'AND NOT EXISTS (SELECT 1 FROM mappings m WHERE m.source_id = ea.id)',
+                [workspace_id, source_type, list(destination_value_id_map.keys())]
+            )
+            source_rows = await cursor.fetchall()
+
+        rows = [
+            {
+                'source_type': source_type,
+                'source': source_id,
+                'destination_type': destination_type,
+                'destination': destination_value_id_map[value],
+                'workspace': workspace_id
+            } for source_id, value in source_rows
+        ]
+        result = await abulk_upsert(connection, Mapping, rows, update_fields=[], update=False)
+
+        created_ids = set(result['created_ids'])
+        async with connection.cursor() as cursor:
+            await cursor.execute(
+                'SELECT id, source_id, destination_id FROM mappings WHERE id = ANY(%s)', [list(created_ids)]
+            )
+            created_mappings = await cursor.fetchall()
+
+            if set_auto_mapped_flag and created_mappings:
+                await cursor.execute(
+                    'UPDATE expense_attributes SET auto_mapped = true WHERE id = ANY(%s)',
+                    [[source_id for _, source_id, _ in created_mappings]]
+                )
+
+    return [
+        Mapping(
+            id=mapping_id,
+            source_type=source_type,
+            source_id=source_id,
+            destination_type=destination_type,
+            destination_id=destination_id,
+            workspace_id=workspace_id
+        ) for mapping_id, source_id, destination_id in created_mappings
+    ]
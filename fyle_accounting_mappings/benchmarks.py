@@ -0,0 +1,337 @@
+"""
+Benchmarks of the bulk write and async paths, run from the shell of a host project against its database.
+The upsert, load and mapping rule benchmarks work in a transaction that is rolled back, the concurrency benchmark commits
+its rows on many connections and deletes them once it is done.
+
+from fyle_accounting_mappings.benchmarks import benchmark_upsert
+benchmark_upsert(workspace_id=1, attribute_count=50000)
+"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from .async_api import acreate_or_update_mapping
+from .loaders import load_destination_attributes, load_expense_attributes
+from .models import DestinationAttribute, ExpenseAttribute, Mapping, MappingRule, MappingSetting, MAPPING_RULE_TYPES
+from .rules import CompiledRules, apply_mapping_rules
+
+logger = logging.getLogger(__name__)
+
+
+class Rollback(Exception):
+    """
+    Raised to roll back the transaction of a benchmark run
+    """
+
+
+def run_in_rollback(function: Callable, *args, **kwargs):
+    """
+    Run a function in a transaction that is rolled back afterwards
+    :param function: Function to run
+    :return: return value of the function
+    """
+    result = None
+
+    try:
+        with transaction.atomic():
+            result = function(*args, **kwargs)
+            raise Rollback()
+    except Rollback:
+        pass
+
+    return result
+
+
+def time_function(function: Callable, *args, **kwargs) -> float:
+    """
+    Time a function
+    :param function: Function to time
+    :return: seconds
+    """
+    start = time.monotonic()
+    function(*args, **kwargs)
+
+    return time.monotonic() - start
+
+
+def construct_benchmark_attributes(attribute_count: int, changed_every: int = 0) -> (List[Dict], List[Dict]):
+    """
+    Construct expense and destination attribute payloads
+    :param attribute_count: Attributes per payload
+    :param changed_every: Change the detail of every nth attribute, nothing is changed when 0
+    :return: expense attributes, destination attributes
+    """
+    expense_attributes = []
+    destination_attributes = []
+
+    for index in range(attribute_count):
+        detail = {'version': 2 if changed_every and index % changed_every == 0 else 1}
+        expense_attributes.append({
+            'display_name': 'Benchmark',
+            'value': 'Benchmark Project {0}'.format(index),
+            'source_id': 'benchmark_{0}'.format(index),
+            'detail': detail,
+            'active': True
+        })
+        destination_attributes.append({
+            'display_name': 'Benchmark',
+            'value': 'Benchmark Customer {0}'.format(index),
+            'destination_id': 'benchmark_{0}'.format(index),
+            'detail': detail,
+            'active': True
+        })
+
+    return expense_attributes, destination_attributes
+
+
+def sync_attributes(functions: tuple, attributes: tuple, attribute_type: str, workspace_id: int) -> None:
+    """
+    Sync an expense and a destination attribute payload
+    :param functions: expense attribute and destination attribute sync functions
+    :param attributes: expense attributes and destination attributes
+    :param attribute_type: Attribute type
+    :param workspace_id: Workspace Id
+    """
+    expense_function, destination_function = functions
+    expense_attributes, destination_attributes = attributes
+
+    expense_function(expense_attributes, attribute_type, workspace_id, update=True)
+    destination_function(destination_attributes, attribute_type, workspace_id, update=True)
+
+
+def time_resync(functions: tuple, attributes: tuple, changed_attributes: tuple, attribute_type: str,
+                workspace_id: int) -> float:
+    """
+    Time a re-sync of changed attributes over a first sync
+    :param functions: expense attribute and destination attribute sync functions
+    :param attributes: attributes of the first sync
+    :param changed_attributes: attributes of the re-sync
+    :param attribute_type: Attribute type
+    :param workspace_id: Workspace Id
+    :return: seconds of the re-sync
+    """
+    sync_attributes(functions, attributes, attribute_type, workspace_id)
+
+    return time_function(sync_attributes, functions, changed_attributes, attribute_type, workspace_id)
+
+
+def benchmark_upsert(workspace_id: int, attribute_count: int = 50000, changed_every: int = 10) -> Dict:
+    """
+    Compare bulk_create_or_update_* with the INSERT ... ON CONFLICT bulk_upsert_* path,
+    for a first sync creating every attribute and a re-sync changing every nth attribute
+    :param workspace_id: Workspace Id
+    :param attribute_count: Attributes per sync
+    :param changed_every: Change the detail of every nth attribute in the re-sync
+    :return: {<path>: {'create': <seconds>, 'resync': <seconds>}}
+    """
+    attribute_type = 'BENCHMARK'
+    attributes = construct_benchmark_attributes(attribute_count)
+    changed_attributes = construct_benchmark_attributes(attribute_count, changed_every)
+
+    paths = {
+        'bulk_create_or_update': (
+            ExpenseAttribute.bulk_create_or_update_expense_attributes,
+            DestinationAttribute.bulk_create_or_update_destination_attributes
+        ),
+        'bulk_upsert': (
+            ExpenseAttribute.bulk_upsert_expense_attributes,
+            DestinationAttribute.bulk_upsert_destination_attributes
+        )
+    }
+    results = {}
+
+    for path, functions in paths.items():
+        results[path] = {
+            'create': run_in_rollback(
+                time_function, sync_attributes, functions, attributes, attribute_type, workspace_id),
+            'resync': run_in_rollback(
+                time_resync, functions, attributes, changed_attributes, attribute_type, workspace_id)
+        }
+
+    logger.info('Upsert benchmark for %s attributes - %s', attribute_count, results)
+
+    return results
+
+
+def benchmark_load_attributes(workspace_id: int, attribute_count: int = 100000) -> Dict:
+    """
+    Compare the COPY loaders with bulk_create_or_update_* and bulk_upsert_* for the first sync of a workspace,
+    every path loading the same payload into an empty attribute type
+    :param workspace_id: Workspace Id
+    :param attribute_count: Attributes per payload
+    :return: {<path>: <seconds>}
+    """
+    attribute_type = 'BENCHMARK'
+    attributes = construct_benchmark_attributes(attribute_count)
+
+    paths = {
+        'bulk_create_or_update': (
+            ExpenseAttribute.bulk_create_or_update_expense_attributes,
+            DestinationAttribute.bulk_create_or_update_destination_attributes
+        ),
+        'bulk_upsert': (
+            ExpenseAttribute.bulk_upsert_expense_attributes,
+            DestinationAttribute.bulk_upsert_destination_attributes
+        ),
+        'copy': (load_expense_attributes, load_destination_attributes)
+    }
+    results = {
+        path: run_in_rollback(time_function, sync_attributes, functions, attributes, attribute_type, workspace_id)
+        for path, functions in paths.items()
+    }
+
+    logger.info('Load benchmark for %s attributes - %s', attribute_count, results)
+
+    return results
+
+
+def match_values(compiled_rules: CompiledRules, values: List[str]) -> int:
+    """
+    Match values against compiled rules
+    :param compiled_rules: Compiled rules
+    :param values: Source attribute values
+    :return: number of values matching a rule
+    """
+    return sum(1 for value in values if compiled_rules.match(value) is not None)
+
+
+def time_mapping_rules(workspace_id: int, value_count: int, rule_count: int) -> Dict:
+    """
+    Load benchmark source attributes and rules of every rule type, then time matching the values
+    in memory and apply_mapping_rules end to end
+    :param workspace_id: Workspace Id
+    :param value_count: Source attributes
+    :param rule_count: Mapping rules
+    :return: {'match': <seconds>, 'apply': <seconds>, 'mapped': <count>}
+    """
+    source_type = 'BENCHMARK_SOURCE'
+    destination_type = 'BENCHMARK_DESTINATION'
+    patterns = {
+        'EXACT': 'Benchmark Project {0}',
+        'PREFIX': 'Benchmark Project {0}',
+        'CONTAINS': 'Project {0}',
+        'REGEX': '^Benchmark Project {0}$'
+    }
+    rule_types = [rule_type for rule_type, _ in MAPPING_RULE_TYPES]
+
+    load_expense_attributes([
+        {'display_name': 'Benchmark', 'value': 'Benchmark Project {0}'.format(index), 'source_id': str(index)}
+        for index in range(value_count)
+    ], source_type, workspace_id)
+    load_destination_attributes([
+        {'display_name': 'Benchmark', 'value': 'Benchmark Customer {0}'.format(index), 'destination_id': str(index)}
+        for index in range(rule_count)
+    ], destination_type, workspace_id)
+
+    destination_ids = DestinationAttribute.objects.filter(
+        attribute_type=destination_type, workspace_id=workspace_id).order_by('id').values_list('id', flat=True)
+    MappingRule.objects.bulk_create([
+        MappingRule(
+            source_type=source_type,
+            rule_type=rule_types[index % len(rule_types)],
+            pattern=patterns[rule_types[index % len(rule_types)]].format(index * value_count // rule_count),
+            destination_id=destination_id,
+            priority=index % 10,
+            workspace_id=workspace_id
+        ) for index, destination_id in enumerate(destination_ids)
+    ], batch_size=1000)
+
+    values = list(ExpenseAttribute.objects.filter(
+        attribute_type=source_type, workspace_id=workspace_id).values_list('value', flat=True))
+    compiled_rules = CompiledRules(MappingRule.objects.filter(source_type=source_type, workspace_id=workspace_id))
+
+    start = time.monotonic()
+    mappings = apply_mapping_rules(source_type, destination_type, workspace_id)
+
+    return {
+        'apply': time.monotonic() - start,
+        'match': time_function(match_values, compiled_rules, values),
+        'mapped': len(mappings)
+    }
+
+
+def benchmark_mapping_rules(workspace_id: int, value_count: int = 100000, rule_count: int = 1000) -> Dict:
+    """
+    Time the mapping rules engine on many source values against many rules, an even mix of
+    EXACT, PREFIX, CONTAINS and REGEX rules
+    :param workspace_id: Workspace Id
+    :param value_count: Source attributes
+    :param rule_count: Mapping rules
+    :return: {'match': <seconds>, 'apply': <seconds>, 'mapped': <count>}
+    """
+    results = run_in_rollback(time_mapping_rules, workspace_id, value_count, rule_count)
+
+    logger.info('Mapping rules benchmark for %s values and %s rules - %s', value_count, rule_count, results)
+
+    return results
+
+
+def benchmark_async_concurrency(workspace_ids: List[int], calls_per_workspace: int = 50,
+                                max_concurrency: int = None) -> Dict:
+    """
+    Compare concurrent acreate_or_update_mapping calls on one event loop with the same number of
+    Mapping.create_or_update_mapping calls wrapped in threads, across workspaces.
+    Both paths run at most max_concurrency calls at a time, the async calls behind a semaphore and the
+    thread wrapped calls on a pool of as many workers.
+    Requires psycopg 3, every async call opens its own connection.
+    :param workspace_ids: Workspace Ids
+    :param calls_per_workspace: Mappings created per workspace
+    :param max_concurrency: Calls in flight at a time, defaults to the worker count of a default thread pool
+    :return: {'async': <seconds>, 'thread_wrapped': <seconds>, 'calls': <count>, 'max_concurrency': <count>}
+    """
+    max_concurrency = max_concurrency or min(32, (os.cpu_count() or 1) + 4)
+    source_type = 'BENCHMARK_SOURCE'
+    destination_type = 'BENCHMARK_DESTINATION'
+    source_values = ['Benchmark Source {0}'.format(index) for index in range(calls_per_workspace)]
+
+    for workspace_id in workspace_ids:
+        MappingSetting.objects.get_or_create(
+            source_field=source_type, destination_field=destination_type, workspace_id=workspace_id)
+        ExpenseAttribute.bulk_upsert_expense_attributes([
+            {'display_name': 'Benchmark', 'value': value, 'source_id': value} for value in source_values
+        ], source_type, workspace_id)
+        DestinationAttribute.bulk_upsert_destination_attributes([
+            {'display_name': 'Benchmark', 'value': 'Benchmark Destination', 'destination_id': 'benchmark'}
+        ], destination_type, workspace_id)
+
+    calls = [
+        (source_type, destination_type, value, 'Benchmark Destination', 'benchmark', workspace_id)
+        for workspace_id in workspace_ids for value in source_values
+    ]
+    create_or_update_mapping = sync_to_async(Mapping.create_or_update_mapping, thread_sensitive=False)
+
+    async def run_async():
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def create_mapping(call):
+            async with semaphore:
+                await acreate_or_update_mapping(*call)
+
+        await asyncio.gather(*[create_mapping(call) for call in calls])
+
+    async def run_thread_wrapped():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max_concurrency))
+        await asyncio.gather(*[create_or_update_mapping(*call) for call in calls])
+
+    results = {'calls': len(calls), 'max_concurrency': max_concurrency}
+    try:
+        for path, function in (('async', run_async), ('thread_wrapped', run_thread_wrapped)):
+            Mapping.objects.filter(source_type=source_type, workspace_id__in=workspace_ids).delete()
+            start = time.monotonic()
+            asyncio.run(function())
+            results[path] = time.monotonic() - start
+    finally:
+        Mapping.objects.filter(source_type=source_type, workspace_id__in=workspace_ids).delete()
+        MappingSetting.objects.filter(source_field=source_type, workspace_id__in=workspace_ids).delete()
+        ExpenseAttribute.objects.filter(attribute_type=source_type, workspace_id__in=workspace_ids).delete()
+        DestinationAttribute.objects.filter(attribute_type=destination_type, workspace_id__in=workspace_ids).delete()
+
+    logger.info('Async concurrency benchmark - %s', results)
+
+    return results
@@ -0,0 +1,166 @@
+"""
+Shared executor for bulk writes
+"""
+import json
+import logging
+import time
+from typing import Callable, List
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class BulkWriteExecutor:
+    """
+    Runs bulk writes inside one transaction and sizes every batch from the width of the rows
+    and the latency observed for the previous statement of the same operation.
+
+    with BulkWriteExecutor() as executor:
+        executor.bulk_create(Mapping, mapping_batch)
+        executor.bulk_update(ExpenseAttribute, attributes, fields=['auto_mapped'])
+
+    executor.stats = {'bulk_create:mappings': {'rows': 1200, 'statements': 2, 'seconds': 0.08}, ...}
+    """
+    def __init__(self, target_batch_bytes: int = 1024 * 1024, target_statement_seconds: float = 0.5,
+                 min_batch_size: int = 50, max_batch_size: int = 5000, sample_size: int = 20):
+        """
+        Initialize the BulkWriteExecutor class.
+        :param target_batch_bytes: Approximate payload size of a single statement
+        :param target_statement_seconds: Latency a single statement should stay under
+        :param min_batch_size: Lower bound of the batch size
+        :param max_batch_size: Upper bound of the batch size
+        :param sample_size: Rows looked at to estimate the row width
+        """
+        self.target_batch_bytes = target_batch_bytes
+        self.target_statement_seconds = target_statement_seconds
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.sample_size = sample_size
+        self.batch_sizes = {}
+        self.stats = {}
+        self.atomic = None
+
+    def __enter__(self):
+        self.atomic = transaction.atomic()
+        self.atomic.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.atomic.__exit__(exc_type, exc_value, traceback)
+
+        if exc_type is None and self.stats:
+            logger.info('Bulk writes completed - %s', self.stats)
+
+    def estimate_row_width(self, rows: list, fields: List[str] = None) -> int:
+        """
+        Estimate the payload size of a row in bytes from a sample of rows
+        :param rows: Model instances, dicts or scalar values
+        :param fields: Fields written, all concrete fields when not given
+        :return: average row width in bytes
+        """
+        sample = rows[:self.sample_size]
+        total_width = 0
+
+        for row in sample:
+            if isinstance(row, dict):
+                values = [row[field] for field in fields] if fields else list(row.values())
+            elif hasattr(row, '_meta'):
+                values = [
+                    getattr(row, field.attname) for field in row._meta.concrete_fields
+                    if not fields or field.name in fields or field.attname in fields
+                ]
+            else:
+                values = [row]
+
+            for value in values:
+                total_width += len(json.dumps(value, default=str)) if isinstance(value, (dict, list)) \
+                    else len(str(value))
+
+        return max(total_width // max(len(sample), 1), 1)
+
+    def get_batch_size(self, label: str, row_width: int) -> int:
+        """
+        Batch size for the next statement of an operation
+        :param label: Operation label
+        :param row_width: Estimated row width in bytes
+        :return: batch size
+        """
+        if label not in self.batch_sizes:
+            self.batch_sizes[label] = self.target_batch_bytes // row_width
+
+        width_limit = max(self.target_batch_bytes // row_width, self.min_batch_size)
+        return max(self.min_batch_size, min(self.batch_sizes[label], width_limit, self.max_batch_size))
+
+    def record(self, label: str, rows: int, seconds: float) -> None:
+        """
+        Record a statement and tune the batch size of the operation from its latency
+        :param label: Operation label
+        :param rows: Rows written by the statement
+        :param seconds: Statement latency
+        """
+        stats = self.stats.setdefault(label, {'rows': 0, 'statements': 0, 'seconds': 0.0})
+        stats['rows'] += rows
+        stats['statements'] += 1
+        stats['seconds'] += seconds
+
+        if rows and seconds > 0:
+            ideal_batch_size = int(self.target_statement_seconds / (seconds / rows))
+            # Moving halfway towards the ideal size keeps a single slow statement from collapsing the batch size
+            self.batch_sizes[label] = max(
+                self.min_batch_size,
+                min((self.batch_sizes[label] + ideal_batch_size) // 2, self.max_batch_size)
+            )
+
+    def run(self, label: str, rows: list, write_batch: Callable[[list], list], fields: List[str] = None) -> list:
+        """
+        Write rows in adaptively sized batches
+        :param label: Operation label used in stats
+        :param rows: Rows to be written
+        :param write_batch: Callable writing one batch and returning its results
+        :param fields: Fields written, used to estimate the row width
+        :return: concatenated results of write_batch
+        """
+        results = []
+        if not rows:
+            return results
+
+        row_width = self.estimate_row_width(rows, fields)
+        offset = 0
+
+        while offset < len(rows):
+            batch = rows[offset:offset + self.get_batch_size(label, row_width)]
+
+            start = time.monotonic()
+            batch_results = write_batch(batch)
+            self.record(label, len(batch), time.monotonic() - start)
+
+            if batch_results:
+                results.extend(batch_results)
+            offset += len(batch)
+
+        return results
+
+    def bulk_create(self, model, objs: list) -> list:
+        """
+        Bulk create model instances
+        :param model: Django model class
+        :param objs: Model instances
+        :return: created instances
+        """
+        return self.run(
+            'bulk_create:{0}'.format(model._meta.db_table), objs,
+            lambda batch: model.objects.bulk_create(batch, batch_size=len(batch))
+        )
+
+    def bulk_update(self, model, objs: list, fields: List[str]) -> None:
+        """
+        Bulk update fields of model instances
+        :param model: Django model class
+        :param objs: Model instances
+        :param fields: Fields to be updated
+        """
+        def write_batch(batch: list) -> None:
+            model.objects.bulk_update(batch, fields=fields, batch_size=len(batch))
+
+        self.run('bulk_update:{0}'.format(model._meta.db_table), objs, write_batch, fields=fields)
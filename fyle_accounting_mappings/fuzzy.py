@@ -0,0 +1,197 @@
+"""
+Fuzzy matching on a character n-gram inverted index, for the near misses exact matching leaves behind,
+eg. "Travel - Domestic" and "Travel Domestic" or "Jon Smith" and "Jonathan Smith"
+
+matcher = FuzzyMatcher(threshold=0.6)
+matches = matcher.match(source_ids, source_values, destination_ids, destination_values)
+"""
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterable, List, Set, Tuple
+
+from .upsert import iterate_windows
+
+# Index of the destinations in a pool process, set once by the pool initializer
+worker_state = {}
+
+
+def get_fuzzy_key(value: str) -> str:
+    """
+    Normalized value used for fuzzy matching, lower cased, punctuation dropped and whitespace collapsed
+    :param value: Value of the attribute
+    :return: fuzzy key
+    """
+    if value is None:
+        return ''
+
+    return ' '.join(re.sub(r'[\W_]+', ' ', value.lower()).split())
+
+
+def get_ngrams(value: str, ngram_size: int) -> Set[str]:
+    """
+    Character n-grams of a value, padded so words at the edges count as well
+    :param value: Value of the attribute
+    :param ngram_size: Characters per n-gram
+    :return: set of n-grams, empty for an empty value
+    """
+    key = get_fuzzy_key(value)
+    if not key:
+        return set()
+
+    padded = ' {0} '.format(key)
+    if len(padded) <= ngram_size:
+        return {padded}
+
+    return {padded[start:start + ngram_size] for start in range(len(padded) - ngram_size + 1)}
+
+
+class NgramIndex:
+    """
+    Inverted index from n-gram to the destinations containing it, scored by the Dice coefficient
+    of the n-gram sets. A search only probes the rarest n-grams of a value, a destination sharing none of them
+    cannot reach the threshold. Stop-grams, the n-grams of more than max_posting_size destinations like "inc"
+    or "ser", are not probed either, so a search touches at most max_posting_size candidates per probe however large
+    the index, unless every n-gram of the value is a stop-gram. Candidates are verified on the full n-gram sets.
+    """
+    def __init__(self, ids: Iterable[int], values: Iterable[str], ngram_size: int = 3, max_posting_size: int = 100):
+        """
+        Initialize the NgramIndex class.
+        :param ids: Destination attribute ids
+        :param values: Destination values, in the order of the ids
+        :param ngram_size: Characters per n-gram
+        :param max_posting_size: Destinations above which an n-gram is a stop-gram, the rarest one is probed regardless
+        """
+        self.ids = []
+        self.ngram_sets = []
+        self.postings = {}
+        self.ngram_size = ngram_size
+        self.max_posting_size = max_posting_size
+
+        for attribute_id, value in zip(ids, values):
+            ngrams = get_ngrams(value, ngram_size)
+            if not ngrams:
+                continue
+
+            position = len(self.ids)
+            self.ids.append(attribute_id)
+            self.ngram_sets.append(ngrams)
+            for ngram in ngrams:
+                self.postings.setdefault(ngram, []).append(position)
+
+    def search(self, value: str, threshold: float) -> Tuple[int, float]:
+        """
+        Best scoring destination of a value
+        :param value: Source value
+        :param threshold: Minimum Dice coefficient, between 0 and 1
+        :return: destination attribute id and score, None and 0 when no destination reaches the threshold
+        """
+        ngrams = get_ngrams(value, self.ngram_size)
+        if not ngrams:
+            return None, 0
+
+        # Dice >= threshold needs an overlap and a destination size of at least threshold * |ngrams| / (2 - threshold),
+        # and a destination size of at most (2 - threshold) * |ngrams| / threshold
+        min_overlap = max(1, math.ceil(threshold * len(ngrams) / (2 - threshold) - 1e-9))
+        max_count = math.floor((2 - threshold) * len(ngrams) / threshold + 1e-9) if threshold else math.inf
+
+        # A destination missing every n-gram of the prefix shares at most min_overlap - 1 n-grams with the value
+        postings = sorted((self.postings.get(ngram, ()) for ngram in ngrams), key=len)
+        candidates = set(postings[0])
+        candidates.update(chain.from_iterable(
+            posting for posting in postings[1:len(ngrams) - min_overlap + 1] if len(posting) <= self.max_posting_size
+        ))
+
+        best_position, best_score = None, 0
+        for position in candidates:
+            ngram_set = self.ngram_sets[position]
+            if len(ngram_set) < min_overlap or len(ngram_set) > max_count:
+                continue
+
+            overlap = len(ngrams & ngram_set)
+            if overlap < min_overlap:
+                continue
+
+            score = 2 * overlap / (len(ngrams) + len(ngram_set))
+            # Ties go to the destination indexed first, whatever the set iteration order
+            if score >= threshold and (score > best_score or (score == best_score and position < best_position)):
+                best_position, best_score = position, score
+
+        if best_position is None:
+            return None, 0
+
+        return self.ids[best_position], best_score
+
+
+def initialize_worker_index(index: NgramIndex):
+    """
+    Install the destination index in a pool process, so it is pickled once per process instead of per shard
+    :param index: Destination index
+    """
+    worker_state['index'] = index
+
+
+def search_shard(values: List[str], threshold: float) -> List[int]:
+    """
+    Search a shard of source values against the index of the pool process
+    :param values: Source values
+    :param threshold: Minimum Dice coefficient
+    :return: destination attribute ids, None where nothing matched
+    """
+    return [worker_state['index'].search(value, threshold)[0] for value in values]
+
+
+class FuzzyMatcher:
+    """
+    Matches source values to the most similar destination value above a threshold.
+    The destination index is built once per match call, scoring is sharded across a process pool
+    when max_workers is set and there is more than one shard of sources.
+    """
+    def __init__(self, threshold: float = 0.6, ngram_size: int = 3, max_workers: int = None,
+                 shard_size: int = 5000, max_posting_size: int = 100):
+        """
+        Initialize the FuzzyMatcher class.
+        :param threshold: Minimum Dice coefficient of the n-gram sets, between 0 and 1
+        :param ngram_size: Characters per n-gram
+        :param max_workers: Process pool size, scoring runs in this process when not given
+        :param shard_size: Source values scored per pool task
+        :param max_posting_size: Destinations above which an n-gram is not probed for candidates
+        """
+        self.threshold = threshold
+        self.ngram_size = ngram_size
+        self.max_workers = max_workers
+        self.shard_size = shard_size
+        self.max_posting_size = max_posting_size
+
+    def match(self, source_ids: List[int], source_values: List[str], destination_ids: Iterable[int],
+              destination_values: Iterable[str]) -> List[Tuple[int, int]]:
+        """
+        Match every source value to its best destination
+        :param source_ids: Source attribute ids
+        :param source_values: Source values, in the order of the ids
+        :param destination_ids: Destination attribute ids
+        :param destination_values: Destination values, in the order of the ids
+        :return: [(<source id>, <destination id>)] for the sources reaching the threshold, in source order
+        """
+        index = NgramIndex(destination_ids, destination_values, self.ngram_size, self.max_posting_size)
+        if not index.ids or not source_ids:
+            return []
+
+        shards = list(iterate_windows(source_values, self.shard_size))
+
+        if self.max_workers and self.max_workers > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=initialize_worker_index, initargs=(index,)) as pool:
+                destination_id_shards = pool.map(search_shard, shards, [self.threshold] * len(shards))
+                matched_destination_ids = [
+                    destination_id for destination_id_shard in destination_id_shards
+                    for destination_id in destination_id_shard
+                ]
+        else:
+            matched_destination_ids = [index.search(value, self.threshold)[0] for value in source_values]
+
+        return [
+            (source_id, destination_id) for source_id, destination_id in zip(source_ids, matched_destination_ids)
+            if destination_id is not None
+        ]
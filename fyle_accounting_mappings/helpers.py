@@ -1,62 +1,77 @@
-from typing import List
+from typing import Callable, Dict, Iterable, Iterator, List
 
 from django.db.models import Q
 
 import django_filters
 
 
-from .models import EmployeeMapping, DestinationAttribute, ExpenseAttribute
+from .executor import BulkWriteExecutor
+from .fuzzy import FuzzyMatcher
+from .models import EmployeeMapping, DestinationAttribute, ExpenseAttribute, get_match_key, \
+    get_employee_match_key, filter_by_employee_match_keys, create_mappings_and_update_flag
+from .utils import assert_valid, iterate_by_keyset
+
+EMPLOYEE_MAPPING_DESTINATION_FIELDS = [
+    'destination_employee_id', 'destination_vendor_id', 'destination_card_account_id'
+]
 
 class EmployeesAutoMappingHelper:
     """
     EmployeesAutoMappingHelper is a helper class to automatically map employee names
     to employee numbers.
     """
-    def __init__(self, workspace_id: int, destination_type: str, employee_mapping_preference: str = ''):
+    def __init__(self, workspace_id: int, destination_type: str, employee_mapping_preference: str = '',
+                 fuzzy_matcher: FuzzyMatcher = None):
         """
         Initialize the EmployeesAutoMappingHelper class.
+        :param fuzzy_matcher: Also map the employees without an exact match to their most similar destination,
+            only for the NAME preference, a near miss on an email or employee code is a different employee
         """
+        assert_valid(
+            fuzzy_matcher is None or employee_mapping_preference == 'NAME',
+            'Fuzzy matching is only supported for the NAME employee mapping preference'
+        )
+
         self.destination_type = destination_type
         self.employee_mapping_preference = employee_mapping_preference
         self.workspace_id = workspace_id
+        self.fuzzy_matcher = fuzzy_matcher
         self.destination_value_id_map = {}
+        self.destination_match_key_maps = {}
 
     @staticmethod
     def create_mappings_and_update_flag(mapping_creation_batch: List[EmployeeMapping],
-                                        mapping_updation_batch: list, update_key: str) -> None:
+                                        mapping_updation_batch: list, update_key,
+                                        set_auto_mapped_flag: bool = True) -> None:
         """
         Create Mappings and Update Flag
         :param mapping_creation_batch: Mapping Creation Batch
         :param mapping_updation_batch: Mapping Updation Batch
-        :param update_key: Update Key
+        :param update_key: Update Key, or a list of them
+        :param set_auto_mapped_flag: set auto mapped to expense attributes
         :return: created mappings
         """
-        mappings = []
-        expense_attributes_to_be_updated = []
+        with BulkWriteExecutor() as executor:
+            if mapping_creation_batch:
+                # The auto_mapped flag is set in the same statement as the insert
+                create_mappings_and_update_flag(
+                    mapping_creation_batch, set_auto_mapped_flag, model_type=EmployeeMapping, executor=executor)
+
+            if mapping_updation_batch:
+                executor.bulk_update(
+                    EmployeeMapping, mapping_updation_batch,
+                    fields=update_key if isinstance(update_key, list) else [update_key]
+                )
 
-        if mapping_creation_batch:
-            created_mappings = EmployeeMapping.objects.bulk_create(mapping_creation_batch, batch_size=50)
-            mappings.extend(created_mappings)
+            if mapping_updation_batch and set_auto_mapped_flag:
+                def update_flag(source_employee_ids: List[int]) -> None:
+                    ExpenseAttribute.objects.filter(id__in=source_employee_ids).update(auto_mapped=True)
 
-        if mapping_updation_batch:
-            EmployeeMapping.objects.bulk_update(
-                mapping_updation_batch, fields=[update_key], batch_size=50
-            )
-            for mapping in mapping_updation_batch:
-                mappings.append(mapping)
-
-        for mapping in mappings:
-            expense_attributes_to_be_updated.append(
-                ExpenseAttribute(
-                    id=mapping.source_employee.id,
-                    auto_mapped=True
+                executor.run(
+                    'update_flag:expense_attributes',
+                    [mapping.source_employee_id for mapping in mapping_updation_batch],
+                    update_flag
                 )
-            )
-
-        if expense_attributes_to_be_updated:
-            ExpenseAttribute.objects.bulk_update(
-                expense_attributes_to_be_updated, fields=['auto_mapped'], batch_size=50
-            )
 
 
     def get_existing_employee_mappings(self) -> List[EmployeeMapping]:
@@ -89,34 +104,68 @@ class EmployeesAutoMappingHelper:
             source_value = ''
 
         # Checking case insensitive exact name match
-        if source_value.lower() in self.destination_value_id_map:
-            if self.destination_type == 'EMPLOYEE':
-                destination['destination_employee_id'] = self.destination_value_id_map[source_value.lower()]
-            elif self.destination_type == 'VENDOR':
-                destination['destination_vendor_id'] = self.destination_value_id_map[source_value.lower()]
-            elif self.destination_type == 'CREDIT_CARD_ACCOUNT' or self.destination_type == 'CHARGE_CARD_NUMBER':
-                destination['destination_card_account_id'] = self.destination_value_id_map[source_value.lower()]
+        match_key = get_match_key(source_value)
+        destination_field = self.get_destination_field()
+        if match_key in self.destination_value_id_map and destination_field:
+            destination[destination_field] = self.destination_value_id_map[match_key]
 
         return destination
 
+    def get_destination_field(self, destination_type: str = None) -> str:
+        """
+        Get the employee mapping column of the destination type
+        :param destination_type: Destination type, the helper's destination type when not given
+        :return: Employee mapping column
+        """
+        destination_type = destination_type or self.destination_type
+
+        if destination_type == 'EMPLOYEE':
+            return 'destination_employee_id'
+        elif destination_type == 'VENDOR':
+            return 'destination_vendor_id'
+        elif destination_type == 'CREDIT_CARD_ACCOUNT' or destination_type == 'CHARGE_CARD_NUMBER':
+            return 'destination_card_account_id'
+
+        return None
+
+    def check_cascading_matches(self, source_attribute: ExpenseAttribute,
+                                employee_mapping_preferences: List[str]) -> (dict, str):
+        """
+        Check the source attribute against the destination match key maps, in preference order
+        :param source_attribute: Source Attribute
+        :param employee_mapping_preferences: Preferences in the order they are tried, e.g. ['EMAIL', 'NAME']
+        :return: Destination Column and value if a match is found, preference that matched
+        """
+        destination_field = self.get_destination_field()
+
+        for employee_mapping_preference in employee_mapping_preferences:
+            match_key = get_employee_match_key(source_attribute, employee_mapping_preference)
+            destination_match_key_map = self.destination_match_key_maps[employee_mapping_preference]
+
+            if match_key and match_key in destination_match_key_map and destination_field:
+                return {destination_field: destination_match_key_map[match_key]}, employee_mapping_preference
+
+        return {}, None
+
 
     def construct_existing_employee_mappings_map(self) -> dict:
         """
         Construct Existing Employee Mappings Map
         :return: Existing Employee Mappings Map
         """
-        existing_employee_mappings = self.get_existing_employee_mappings()
-        existing_employee_mappings_map = {employee_mapping.source_employee_id: employee_mapping.id \
-            for employee_mapping in existing_employee_mappings}
-
-        return existing_employee_mappings_map
+        return dict(
+            self.get_existing_employee_mappings().values_list('source_employee_id', 'id')
+        )
 
 
-    def construct_mapping_payload(self, employee_source_attributes: List[ExpenseAttribute]
+    def construct_mapping_payload(self, employee_source_attributes: Iterable[ExpenseAttribute],
+                                  check_matches: Callable[[ExpenseAttribute], dict] = None
                                  ) -> (List[EmployeeMapping], list, str):
         """
         Construct mapping payload
         :param employee_source_attributes: Employee Source Attributes
+        :param check_matches: Matcher returning the destination of a source attribute,
+            the match key is looked up in destination_value_id_map when not given
         :return: mapping_creation_batch, mapping_updation_batch, update_key
         """
         mapping_creation_batch = []
@@ -124,37 +173,61 @@ class EmployeesAutoMappingHelper:
         update_key = None
 
         existing_employee_mappings_map = self.construct_existing_employee_mappings_map()
+        destination_field = self.get_destination_field()
+        unmatched_source_attributes = []
+        unmatched_match_keys = []
 
-        for source_attribute in employee_source_attributes:
-            destination = self.check_name_matches(source_attribute)
-
-            if destination:
-                update_key = list(destination.keys())[0]
-                if source_attribute.id in existing_employee_mappings_map:
-                    # If employee mapping row exists, then update it
-                    mapping_updation_batch.append(
-                        EmployeeMapping(
-                            id=existing_employee_mappings_map[source_attribute.id],
-                            source_employee=source_attribute,
-                            **destination
-                        )
+        def add_mapping(source_attribute: ExpenseAttribute, destination: dict) -> str:
+            if source_attribute.id in existing_employee_mappings_map:
+                # If employee mapping row exists, then update it
+                mapping_updation_batch.append(
+                    EmployeeMapping(
+                        id=existing_employee_mappings_map[source_attribute.id],
+                        source_employee=source_attribute,
+                        **destination
                     )
-                else:
-                    # If employee mapping row does not exist, then create it
-                    mapping_creation_batch.append(
-                        EmployeeMapping(
-                            source_employee_id=source_attribute.id,
-                            workspace_id=self.workspace_id,
-                            **destination
-                        )
+                )
+            else:
+                # If employee mapping row does not exist, then create it
+                mapping_creation_batch.append(
+                    EmployeeMapping(
+                        source_employee_id=source_attribute.id,
+                        workspace_id=self.workspace_id,
+                        **destination
                     )
+                )
+
+            return list(destination.keys())[0]
+
+        for source_attribute in employee_source_attributes:
+            if check_matches:
+                destination = check_matches(source_attribute)
+                if destination:
+                    update_key = add_mapping(source_attribute, destination)
+            elif destination_field:
+                # Checking case insensitive exact match
+                match_key = get_employee_match_key(source_attribute, self.employee_mapping_preference)
+                if match_key in self.destination_value_id_map:
+                    update_key = add_mapping(
+                        source_attribute, {destination_field: self.destination_value_id_map[match_key]})
+                elif match_key and self.fuzzy_matcher:
+                    unmatched_source_attributes.append(source_attribute)
+                    unmatched_match_keys.append(match_key)
+
+        if unmatched_source_attributes:
+            # Near misses are matched once every window is joined, against one index of the destinations
+            for position, destination_id in self.fuzzy_matcher.match(
+                    list(range(len(unmatched_source_attributes))), unmatched_match_keys,
+                    self.destination_value_id_map.values(), self.destination_value_id_map.keys()):
+                update_key = add_mapping(unmatched_source_attributes[position], {destination_field: destination_id})
 
         return mapping_creation_batch, mapping_updation_batch, update_key
 
 
-    def get_unmapped_destination_attributes(self) -> list:
+    def get_unmapped_destination_attributes(self, match_keys: List[str] = None) -> list:
         """
         Get Unmapped Destination Attributes
+        :param match_keys: Only the destination attributes these source match keys can match, all when not given
         :return: Unmapped Destination Attributes
         """
         destination_filter = {
@@ -167,16 +240,30 @@ class EmployeesAutoMappingHelper:
         elif self.destination_type == 'VENDOR':
             destination_filter['destination_vendor__isnull'] = True
 
-        return DestinationAttribute.objects.filter(
-            **destination_filter
-        ).values('id', 'value', 'detail')
+        destination_attributes = DestinationAttribute.objects.filter(**destination_filter)
+
+        if match_keys is not None:
+            destination_attributes = filter_by_employee_match_keys(
+                destination_attributes, self.employee_mapping_preference, match_keys)
+
+        return destination_attributes.values('id', 'value', 'match_key', 'detail')
 
 
-    def get_unmapped_source_attributes(self) -> List[EmployeeMapping]:
+    def get_unmapped_source_attributes(self, source_attribute_ids: List[int] = None) -> List[ExpenseAttribute]:
         """
         Get Unmapped Source Attributes
+        :param source_attribute_ids: Restrict to these source attributes, all when not given
         :return: Unmapped Source Attributes
         """
+        return list(self.iter_unmapped_source_attributes(source_attribute_ids))
+
+
+    def iter_unmapped_source_attributes(self, source_attribute_ids: List[int] = None) -> Iterator[ExpenseAttribute]:
+        """
+        Iterate Unmapped Source Attributes, one keyset page at a time
+        :param source_attribute_ids: Restrict to these source attributes, all when not given
+        :return: Unmapped Source Attributes iterator
+        """
         source_filter = {
             'attribute_type': 'EMPLOYEE',
             'workspace_id': self.workspace_id
@@ -190,16 +277,12 @@ class EmployeesAutoMappingHelper:
         elif self.destination_type == 'CREDIT_CARD_ACCOUNT' or self.destination_type == 'CHARGE_CARD_NUMBER':
             source_filter['employeemapping__destination_card_account__isnull'] = True
 
-        employee_source_attributes_count = ExpenseAttribute.objects.filter(**source_filter).count()
-        page_size = 200
-        employee_source_attributes = []
-
-        for offset in range(0, employee_source_attributes_count, page_size):
-            limit = offset + page_size
-            paginated_employee_source_attributes = ExpenseAttribute.objects.filter(**source_filter)[offset:limit]
-            employee_source_attributes.extend(paginated_employee_source_attributes)
+        if source_attribute_ids is not None:
+            source_filter['id__in'] = source_attribute_ids
 
-        return employee_source_attributes
+        return iterate_by_keyset(
+            ExpenseAttribute.objects.filter(**source_filter).only('id', 'value', 'detail')
+        )
 
 
     def set_destination_value_id_map(self, destination_attributes: list) -> dict:
@@ -209,85 +292,239 @@ class EmployeesAutoMappingHelper:
         :return: Destination Value ID Map
         """
         for destination_attribute in destination_attributes:
-            value_to_be_appended = None
-            if self.employee_mapping_preference == 'EMAIL' and destination_attribute['detail'] \
-                    and destination_attribute['detail']['email']:
-                value_to_be_appended = destination_attribute['detail']['email'].replace('*', '')
-            elif self.employee_mapping_preference in ['NAME', 'EMPLOYEE_CODE']:
-                value_to_be_appended = destination_attribute['value'].replace('*', '')
+            value_to_be_appended = self.get_destination_match_key(destination_attribute, self.employee_mapping_preference)
 
             if value_to_be_appended:
-                self.destination_value_id_map[value_to_be_appended.lower()] = destination_attribute['id']
+                self.destination_value_id_map[value_to_be_appended] = destination_attribute['id']
 
+    @staticmethod
+    def get_destination_match_key(destination_attribute: dict, employee_mapping_preference: str) -> str:
+        """
+        Get the match key of a destination attribute for a mapping preference
+        :param destination_attribute: Destination Attribute values
+        :param employee_mapping_preference: EMAIL / NAME / EMPLOYEE_CODE
+        :return: match key
+        """
+        if employee_mapping_preference == 'EMAIL':
+            if destination_attribute['detail'] and destination_attribute['detail'].get('email'):
+                return get_match_key(destination_attribute['detail']['email'])
+        elif employee_mapping_preference in ['NAME', 'EMPLOYEE_CODE']:
+            return destination_attribute['match_key'] or get_match_key(destination_attribute['value'])
 
-    def reimburse_mapping(self) -> None:
+        return None
+
+    def set_destination_match_key_maps(self, destination_attributes: Iterable[dict],
+                                       employee_mapping_preferences: List[str]) -> None:
+        """
+        Construct a Destination Match Key ID Map per preference from a single pass over the destination attributes
+        :param destination_attributes: Destination Attributes
+        :param employee_mapping_preferences: Preferences to build maps for
+        """
+        self.destination_match_key_maps = {
+            employee_mapping_preference: {} for employee_mapping_preference in employee_mapping_preferences
+        }
+
+        for destination_attribute in destination_attributes:
+            for employee_mapping_preference, destination_match_key_map in self.destination_match_key_maps.items():
+                match_key = self.get_destination_match_key(destination_attribute, employee_mapping_preference)
+
+                if match_key:
+                    destination_match_key_map[match_key] = destination_attribute['id']
+
+
+    def reimburse_mapping(self, source_attribute_ids: List[int] = None) -> None:
         """
         Auto map employees
-        :param destination_type: Destination Type of mappings
-        :param employee_mapping_preference: Employee Mapping Preference
-        :param workspace_id: Workspace ID
+        :param source_attribute_ids: Only match these employees, e.g. the ids returned by an upsert, all when not given
         """
-        # Get unmapped destination attributes
-        destination_attributes = self.get_unmapped_destination_attributes()
+        if source_attribute_ids is not None:
+            # Matching only the delta against the destinations its match keys can reach
+            employee_source_attributes = self.get_unmapped_source_attributes(source_attribute_ids)
+            destination_attributes = self.get_unmapped_destination_attributes([
+                get_employee_match_key(source_attribute, self.employee_mapping_preference)
+                for source_attribute in employee_source_attributes
+            ])
+        else:
+            # Get unmapped destination attributes
+            destination_attributes = self.get_unmapped_destination_attributes()
+
+            # Get unmapped source attributes
+            employee_source_attributes = self.iter_unmapped_source_attributes()
 
         # Set destination value id map
         self.set_destination_value_id_map(destination_attributes)
 
-        # Get unmapped source attributes
-        employee_source_attributes = self.get_unmapped_source_attributes()
-
         mapping_creation_batch, mapping_updation_batch, update_key = self.construct_mapping_payload(
             employee_source_attributes
         )
 
         self.create_mappings_and_update_flag(mapping_creation_batch, mapping_updation_batch, update_key)
 
-    def ccc_mapping(self, default_ccc_account_id: str, attribute_type: str = None):
+    def cascading_reimburse_mapping(self, employee_mapping_preferences: List[str],
+                                    source_attribute_ids: List[int] = None) -> Dict[int, str]:
         """
-        Auto map ccc employees
-        :param default_ccc_account_id: Default CCC Account ID
-        :param attribute_type: destination attribute type
+        Auto map employees trying several preferences in order, e.g. email first, then name, then code,
+        with one destination fetch and one pass over the unmapped employees
+        :param employee_mapping_preferences: Preferences in the order they are tried
+        :param source_attribute_ids: Only match these employees, e.g. the ids returned by an upsert, all when not given
+        :return: {<source attribute id>: <preference that matched>}
         """
-        mapping_creation_batch = []
-        mapping_updation_batch = []
+        matched_preferences = {}
 
-        # Get unmapped source attributes
-        employee_source_attributes = self.get_unmapped_source_attributes()
+        destination_attributes = self.get_unmapped_destination_attributes()
+        self.set_destination_match_key_maps(destination_attributes, employee_mapping_preferences)
 
-        default_destination_attribute = DestinationAttribute.objects.filter(
-            destination_id=default_ccc_account_id, workspace_id=self.workspace_id,
-            attribute_type=attribute_type if attribute_type else 'CREDIT_CARD_ACCOUNT'
-        ).first()
+        employee_source_attributes = self.iter_unmapped_source_attributes(source_attribute_ids)
 
-        existing_employee_mappings_map = self.construct_existing_employee_mappings_map()
+        def check_matches(source_attribute: ExpenseAttribute) -> dict:
+            destination, employee_mapping_preference = self.check_cascading_matches(
+                source_attribute, employee_mapping_preferences)
 
-        for source_employee in employee_source_attributes:
-            if source_employee.id in existing_employee_mappings_map:
-                # If employee mapping row exists, then update it
-                mapping_updation_batch.append(
+            if destination:
+                matched_preferences[source_attribute.id] = employee_mapping_preference
+
+            return destination
+
+        mapping_creation_batch, mapping_updation_batch, update_key = self.construct_mapping_payload(
+            employee_source_attributes, check_matches
+        )
+
+        self.create_mappings_and_update_flag(mapping_creation_batch, mapping_updation_batch, update_key)
+
+        return matched_preferences
+
+    def multi_destination_mapping(self, destination_types: List[str],
+                                  default_ccc_account_id: str = None) -> Dict[str, int]:
+        """
+        Auto map employees to several destination types at once, e.g. EMPLOYEE, VENDOR and CREDIT_CARD_ACCOUNT,
+        with one destination fetch and one pass over the employees.
+        The helper's own destination type is not used.
+        Employees only given the default card account are written without the auto_mapped flag, like ccc_mapping.
+        :param destination_types: Destination types to match the employees against
+        :param default_ccc_account_id: Destination Id of the card account given to employees without a card match
+        :return: {<destination type>: <number of employees matched>}, the default card account is not counted
+        """
+        destination_fields = {
+            destination_type: self.get_destination_field(destination_type) for destination_type in destination_types
+        }
+        destination_fields = {
+            destination_type: destination_field for destination_type, destination_field in destination_fields.items()
+            if destination_field
+        }
+        mapped_counts = {destination_type: 0 for destination_type in destination_fields}
+        if not destination_fields:
+            return mapped_counts
+
+        # Only destinations not taken by another employee, card accounts are shared
+        destination_filter = Q()
+        source_filter = Q()
+        for destination_type, destination_field in destination_fields.items():
+            destination_type_filter = Q(attribute_type=destination_type)
+            if destination_field == 'destination_employee_id':
+                destination_type_filter &= Q(destination_employee__isnull=True)
+            elif destination_field == 'destination_vendor_id':
+                destination_type_filter &= Q(destination_vendor__isnull=True)
+
+            destination_filter |= destination_type_filter
+            source_filter |= Q(**{'employeemapping__{0}__isnull'.format(destination_field[:-3]): True})
+
+        destination_attributes = DestinationAttribute.objects.filter(
+            destination_filter, workspace_id=self.workspace_id
+        ).values('id', 'attribute_type', 'destination_id', 'value', 'match_key', 'detail')
+
+        destination_match_key_maps = {destination_type: {} for destination_type in destination_fields}
+        default_card_account_ids = {}
+        for destination_attribute in destination_attributes:
+            match_key = self.get_destination_match_key(destination_attribute, self.employee_mapping_preference)
+            if match_key:
+                destination_match_key_maps[destination_attribute['attribute_type']][match_key] = \
+                    destination_attribute['id']
+
+            if default_ccc_account_id and destination_attribute['destination_id'] == default_ccc_account_id \
+                    and destination_fields[destination_attribute['attribute_type']] == 'destination_card_account_id':
+                default_card_account_ids[destination_attribute['attribute_type']] = destination_attribute['id']
+
+        existing_employee_mappings = {
+            employee_mapping['source_employee_id']: employee_mapping
+            for employee_mapping in EmployeeMapping.objects.filter(workspace_id=self.workspace_id).values(
+                'id', 'source_employee_id', *EMPLOYEE_MAPPING_DESTINATION_FIELDS
+            )
+        }
+
+        # Batches of the employees with a match, and of the ones only given the default card account
+        mapping_creation_batches = {True: [], False: []}
+        mapping_updation_batches = {True: [], False: []}
+        update_keys = {True: set(), False: set()}
+
+        employee_source_attributes = iterate_by_keyset(
+            ExpenseAttribute.objects.filter(
+                source_filter, attribute_type='EMPLOYEE', workspace_id=self.workspace_id
+            ).only('id', 'value', 'detail')
+        )
+
+        for source_attribute in employee_source_attributes:
+            existing_employee_mapping = existing_employee_mappings.get(source_attribute.id, {})
+            match_key = get_employee_match_key(source_attribute, self.employee_mapping_preference)
+            destination = {}
+            matched = False
+
+            for destination_type, destination_field in destination_fields.items():
+                if existing_employee_mapping.get(destination_field) or destination_field in destination:
+                    continue
+
+                if match_key in destination_match_key_maps[destination_type]:
+                    destination[destination_field] = destination_match_key_maps[destination_type][match_key]
+                    mapped_counts[destination_type] += 1
+                    matched = True
+                elif destination_type in default_card_account_ids:
+                    destination[destination_field] = default_card_account_ids[destination_type]
+
+            if not destination:
+                continue
+
+            if existing_employee_mapping:
+                # Carrying the current columns along, the bulk update writes every updated column of every row
+                update_keys[matched].update(destination.keys())
+                mapping_updation_batches[matched].append(
                     EmployeeMapping(
-                        id=existing_employee_mappings_map[source_employee.id],
-                        destination_card_account_id=default_destination_attribute.id
+                        id=existing_employee_mapping['id'],
+                        source_employee_id=source_attribute.id,
+                        **{
+                            destination_field: destination.get(
+                                destination_field, existing_employee_mapping[destination_field])
+                            for destination_field in EMPLOYEE_MAPPING_DESTINATION_FIELDS
+                        }
                     )
                 )
             else:
-                # If employee mapping row does not exist, then create it
-                mapping_creation_batch.append(
+                mapping_creation_batches[matched].append(
                     EmployeeMapping(
-                        source_employee_id=source_employee.id,
-                        destination_card_account_id=default_destination_attribute.id,
-                        workspace_id=self.workspace_id
+                        source_employee_id=source_attribute.id,
+                        workspace_id=self.workspace_id,
+                        **destination
                     )
                 )
 
-        if mapping_creation_batch:
-            EmployeeMapping.objects.bulk_create(mapping_creation_batch, batch_size=50)
-
-        if mapping_updation_batch:
-            EmployeeMapping.objects.bulk_update(
-                mapping_updation_batch, fields=['destination_card_account_id'], batch_size=50
+        for matched in (True, False):
+            self.create_mappings_and_update_flag(
+                mapping_creation_batches[matched], mapping_updation_batches[matched], sorted(update_keys[matched]),
+                set_auto_mapped_flag=matched
             )
 
+        return mapped_counts
+
+    def ccc_mapping(self, default_ccc_account_id: str, attribute_type: str = None):
+        """
+        Auto map ccc employees, assigns the default card account to every employee of the workspace
+        without a card account, instead of only the employees unmapped for the helper's destination_type
+        :param default_ccc_account_id: Default CCC Account ID
+        :param attribute_type: destination attribute type
+        :return: number of employee mappings created or updated
+        """
+        return EmployeeMapping.assign_default_card_account(
+            attribute_type if attribute_type else 'CREDIT_CARD_ACCOUNT', default_ccc_account_id, self.workspace_id
+        )
+
 
 class ExpenseAttributeFilter(django_filters.FilterSet):
     mapping_source_alphabets = django_filters.CharFilter(method='filter_mapping_source_alphabets')
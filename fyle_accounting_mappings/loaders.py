@@ -0,0 +1,229 @@
+"""
+COPY based bulk loaders for first time workspace onboarding
+"""
+import csv
+import io
+import json
+import logging
+import time
+from typing import Dict, Iterable, List
+
+from django.db import connection, transaction
+
+from .models import get_attribute_fingerprint, get_match_key
+from .upsert import iterate_windows
+
+logger = logging.getLogger(__name__)
+
+
+def copy_rows(cursor, table: str, columns: List[str], rows: Iterable[list],
+              null_columns: List[str], window_size: int = 10000) -> int:
+    """
+    Stream rows into a table with COPY FROM STDIN, one CSV buffer per window
+    :param cursor: Django cursor
+    :param table: Table name
+    :param columns: Column names, in row order
+    :param rows: Iterable of row value lists
+    :param null_columns: Columns where an empty value is loaded as NULL
+    :param window_size: Rows per COPY buffer
+    :return: number of rows copied
+    """
+    quote_name = connection.ops.quote_name
+    copy_sql = 'COPY {0} ({1}) FROM STDIN WITH (FORMAT csv, FORCE_NULL ({2}))'.format(
+        quote_name(table),
+        ', '.join(quote_name(column) for column in columns),
+        ', '.join(quote_name(column) for column in null_columns)
+    )
+    rows_copied = 0
+
+    for window in iterate_windows(rows, window_size):
+        buffer = io.StringIO()
+        # Strings are always quoted so an empty value stays an empty string outside null_columns
+        csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(window)
+        buffer.seek(0)
+
+        if hasattr(cursor.cursor, 'copy_expert'):
+            cursor.cursor.copy_expert(copy_sql, buffer)
+        else:
+            with cursor.cursor.copy(copy_sql) as copy:
+                copy.write(buffer.read())
+
+        rows_copied += len(window)
+
+    return rows_copied
+
+
+def load_expense_attributes(attributes: Iterable[Dict], attribute_type: str, workspace_id: int,
+                            update: bool = False) -> Dict:
+    """
+    Load Expense Attributes through a COPY into a staging table and a single merge statement.
+    Meant for the first sync of a workspace, later syncs should go through the upsert methods on the model.
+    :param attributes: Iterable of attribute dicts, same shape as bulk_create_or_update_expense_attributes
+    :param attribute_type: Attribute type
+    :param workspace_id: Workspace Id
+    :param update: Update Pre-existing records or not
+    :return: {'rows_copied', 'created', 'updated', 'copy_seconds', 'merge_seconds'}
+    """
+    def construct_row(attribute: Dict) -> list:
+        return [
+            attribute['display_name'],
+            attribute['value'],
+            attribute['source_id'],
+            json.dumps(attribute['detail']) if 'detail' in attribute and attribute['detail'] is not None else None,
+            attribute['active'] if 'active' in attribute else None,
+            get_match_key(attribute['value']),
+            get_attribute_fingerprint(
+                attribute['value'],
+                attribute['detail'] if 'detail' in attribute else None,
+                attribute['active'] if 'active' in attribute else None,
+                source_id=attribute['source_id']
+            )
+        ]
+
+    conflict_action = 'DO NOTHING'
+    if update:
+        conflict_action = """
+            DO UPDATE SET source_id = EXCLUDED.source_id, detail = EXCLUDED.detail, active = EXCLUDED.active,
+                fingerprint = EXCLUDED.fingerprint, updated_at = now()
+            WHERE t.fingerprint IS DISTINCT FROM EXCLUDED.fingerprint
+        """
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Temporary tables are never WAL logged and are dropped with the transaction
+            cursor.execute("""
+                CREATE TEMPORARY TABLE expense_attributes_staging (
+                    seq bigserial, display_name text, value text, source_id text,
+                    detail jsonb, active boolean, match_key text, fingerprint text
+                ) ON COMMIT DROP
+            """)
+
+            start = time.monotonic()
+            rows_copied = copy_rows(
+                cursor, 'expense_attributes_staging',
+                ['display_name', 'value', 'source_id', 'detail', 'active', 'match_key', 'fingerprint'],
+                (construct_row(attribute) for attribute in attributes),
+                null_columns=['detail', 'active']
+            )
+            copy_seconds = time.monotonic() - start
+
+            start = time.monotonic()
+            cursor.execute("""
+                WITH merged AS (
+                    INSERT INTO expense_attributes AS t (
+                        attribute_type, display_name, value, source_id, detail, active, match_key, fingerprint,
+                        workspace_id, auto_mapped, auto_created, created_at, updated_at
+                )
+                SELECT DISTINCT ON (value)
+                    %s, display_name, value, source_id, detail, active, match_key, fingerprint, %s,
+                    false, false, now(), now()
+                FROM expense_attributes_staging
+                ORDER BY value, seq DESC
+                ON CONFLICT (value, attribute_type, workspace_id) {0}
+                RETURNING (t.xmax = 0) AS created
+                )
+                SELECT count(*) FILTER (WHERE created), count(*) FILTER (WHERE NOT created) FROM merged
+            """.format(conflict_action), [attribute_type, workspace_id])
+            created, updated = cursor.fetchone()
+            merge_seconds = time.monotonic() - start
+
+    result = {
+        'rows_copied': rows_copied,
+        'created': created,
+        'updated': updated,
+        'copy_seconds': copy_seconds,
+        'merge_seconds': merge_seconds
+    }
+    logger.info('Loaded %s expense attributes for workspace_id %s - %s', attribute_type, workspace_id, result)
+
+    return result
+
+
+def load_destination_attributes(attributes: Iterable[Dict], attribute_type: str, workspace_id: int,
+                                update: bool = False) -> Dict:
+    """
+    Load Destination Attributes through a COPY into a staging table and a single merge statement.
+    Meant for the first sync of a workspace, later syncs should go through the upsert methods on the model.
+    :param attributes: Iterable of attribute dicts, same shape as bulk_create_or_update_destination_attributes
+    :param attribute_type: Attribute type
+    :param workspace_id: Workspace Id
+    :param update: Update Pre-existing records or not
+    :return: {'rows_copied', 'created', 'updated', 'copy_seconds', 'merge_seconds'}
+    """
+    def construct_row(attribute: Dict) -> list:
+        code = " ".join(attribute['code'].split()) if 'code' in attribute and attribute['code'] else None
+        return [
+            attribute['display_name'],
+            attribute['value'],
+            attribute['destination_id'],
+            json.dumps(attribute['detail']) if 'detail' in attribute and attribute['detail'] is not None else None,
+            attribute['active'] if 'active' in attribute else None,
+            code,
+            get_match_key(attribute['value']),
+            get_attribute_fingerprint(
+                attribute['value'],
+                attribute['detail'] if 'detail' in attribute else None,
+                attribute['active'] if 'active' in attribute else None,
+                code,
+                attribute['destination_id']
+            )
+        ]
+
+    conflict_action = 'DO NOTHING'
+    if update:
+        conflict_action = """
+            DO UPDATE SET value = EXCLUDED.value, detail = EXCLUDED.detail, active = EXCLUDED.active,
+                code = EXCLUDED.code, match_key = EXCLUDED.match_key, fingerprint = EXCLUDED.fingerprint,
+                updated_at = now()
+            WHERE t.fingerprint IS DISTINCT FROM EXCLUDED.fingerprint
+        """
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Temporary tables are never WAL logged and are dropped with the transaction
+            cursor.execute("""
+                CREATE TEMPORARY TABLE destination_attributes_staging (
+                    seq bigserial, display_name text, value text, destination_id text,
+                    detail jsonb, active boolean, code text, match_key text, fingerprint text
+                ) ON COMMIT DROP
+            """)
+
+            start = time.monotonic()
+            rows_copied = copy_rows(
+                cursor, 'destination_attributes_staging',
+                ['display_name', 'value', 'destination_id', 'detail', 'active', 'code', 'match_key', 'fingerprint'],
+                (construct_row(attribute) for attribute in attributes),
+                null_columns=['detail', 'active', 'code']
+            )
+            copy_seconds = time.monotonic() - start
+
+            start = time.monotonic()
+            cursor.execute("""
+                WITH merged AS (
+                    INSERT INTO destination_attributes AS t (
+                        attribute_type, display_name, value, destination_id, detail, active, code, match_key,
+                        fingerprint, workspace_id, auto_created, created_at, updated_at
+                )
+                SELECT DISTINCT ON (destination_id)
+                    %s, display_name, value, destination_id, detail, active, code, match_key, fingerprint, %s,
+                    false, now(), now()
+                FROM destination_attributes_staging
+                ORDER BY destination_id, seq DESC
+                ON CONFLICT (destination_id, attribute_type, workspace_id, display_name) {0}
+                RETURNING (t.xmax = 0) AS created
+                )
+                SELECT count(*) FILTER (WHERE created), count(*) FILTER (WHERE NOT created) FROM merged
+            """.format(conflict_action), [attribute_type, workspace_id])
+            created, updated = cursor.fetchone()
+            merge_seconds = time.monotonic() - start
+
+    result = {
+        'rows_copied': rows_copied,
+        'created': created,
+        'updated': updated,
+        'copy_seconds': copy_seconds,
+        'merge_seconds': merge_seconds
+    }
+    logger.info('Loaded %s destination attributes for workspace_id %s - %s', attribute_type, workspace_id, result)
+
+    return result
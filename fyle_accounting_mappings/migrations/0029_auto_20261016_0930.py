@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-16 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fyle_accounting_mappings', '0028_auto_20241226_1030'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='destinationattribute',
+            name='fingerprint',
+            field=models.CharField(help_text='Hash of value, detail, active, code and destination id of the attribute', max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='expenseattribute',
+            name='fingerprint',
+            field=models.CharField(help_text='Hash of value, detail, active and source id of the attribute', max_length=32, null=True),
+        ),
+    ]
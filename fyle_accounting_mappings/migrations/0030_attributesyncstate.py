@@ -0,0 +1,34 @@
+# Generated by Django 3.2 on 2026-10-16 11:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspaces', '0001_initial'),
+        ('fyle_accounting_mappings', '0029_auto_20261016_0930'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttributeSyncState',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('attribute_type', models.CharField(help_text='Type of the synced attribute', max_length=255)),
+                ('is_destination', models.BooleanField(default=False, help_text='Destination attribute sync if true, Fyle expense attribute sync otherwise')),
+                ('last_synced_at', models.DateTimeField(help_text='Start of the last successful sync', null=True)),
+                ('cursor', models.CharField(help_text='Source system cursor of the last successful sync', max_length=255, null=True)),
+                ('rows_created', models.IntegerField(default=0, help_text='Rows created by the last successful sync')),
+                ('rows_updated', models.IntegerField(default=0, help_text='Rows updated by the last successful sync')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Created at datetime')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Updated at datetime')),
+                ('workspace', models.ForeignKey(help_text='Reference to Workspace model', on_delete=django.db.models.deletion.PROTECT, to='workspaces.workspace')),
+            ],
+            options={
+                'db_table': 'attribute_sync_states',
+                'unique_together': {('workspace', 'attribute_type', 'is_destination')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2 on 2026-10-16 13:10
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspaces', '0001_initial'),
+        ('fyle_accounting_mappings', '0031_expenseattributesseenids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DestinationAttributesSeenIds',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('attribute_type', models.CharField(help_text='Type of destination attribute', max_length=255)),
+                ('sync_run_id', models.CharField(default='', help_text='Identifier of the sync run', max_length=255)),
+                ('destination_ids', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), help_text='Destination IDs seen in the page', size=None)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Created at datetime')),
+                ('workspace', models.ForeignKey(help_text='Reference to Workspace model', on_delete=django.db.models.deletion.PROTECT, to='workspaces.workspace')),
+            ],
+            options={
+                'db_table': 'destination_attributes_seen_ids',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='destinationattributesseenids',
+            index=models.Index(fields=['workspace', 'attribute_type', 'sync_run_id'], name='destination_workspa_bd2ca9_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2 on 2026-10-16 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fyle_accounting_mappings', '0032_destinationattributesseenids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='destinationattribute',
+            name='match_key',
+            field=models.CharField(help_text='Normalized value used for matching', max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='expenseattribute',
+            name='match_key',
+            field=models.CharField(help_text='Normalized value used for matching', max_length=1000, null=True),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE expense_attributes
+                SET match_key = lower(btrim(regexp_replace(replace(value, '*', ''), '\\s+', ' ', 'g')));
+                UPDATE destination_attributes
+                SET match_key = lower(btrim(regexp_replace(replace(value, '*', ''), '\\s+', ' ', 'g')));
+            """,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+        migrations.AddIndex(
+            model_name='destinationattribute',
+            index=models.Index(fields=['workspace', 'attribute_type', 'match_key'], name='destination_workspa_985eb5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expenseattribute',
+            index=models.Index(fields=['workspace', 'attribute_type', 'match_key'], name='expense_att_workspa_022a78_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-16 18:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspaces', '0001_initial'),
+        ('fyle_accounting_mappings', '0033_match_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MappingRule',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('source_type', models.CharField(help_text='Type of source attribute, eg. PROJECT', max_length=255)),
+                ('rule_type', models.CharField(choices=[('EXACT', 'EXACT'), ('PREFIX', 'PREFIX'), ('CONTAINS', 'CONTAINS'), ('REGEX', 'REGEX')], help_text='How the pattern is matched against the source value', max_length=255)),
+                ('pattern', models.CharField(help_text='Pattern matched against the source value, ignoring case', max_length=1000)),
+                ('priority', models.IntegerField(default=0, help_text='Rules with a lower priority win when several rules match')),
+                ('is_enabled', models.BooleanField(default=True, help_text='Is the rule Enabled')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Created at datetime')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Updated at datetime')),
+                ('destination', models.ForeignKey(help_text='Destination attribute the matching source attributes are mapped to', on_delete=django.db.models.deletion.PROTECT, related_name='mapping_rules', to='fyle_accounting_mappings.destinationattribute')),
+                ('workspace', models.ForeignKey(help_text='Reference to Workspace model', on_delete=django.db.models.deletion.PROTECT, to='workspaces.workspace')),
+            ],
+            options={
+                'db_table': 'mapping_rules',
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2 on 2026-10-17 10:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fyle_accounting_mappings', '0034_mappingrule'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION expense_attributes_clear_fingerprint() RETURNS trigger AS $$
+                BEGIN
+                    IF NEW.fingerprint IS NOT DISTINCT FROM OLD.fingerprint
+                        AND (NEW.value, NEW.detail, NEW.active, NEW.source_id)
+                            IS DISTINCT FROM (OLD.value, OLD.detail, OLD.active, OLD.source_id) THEN
+                        NEW.fingerprint := NULL;
+                    END IF;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER expense_attributes_clear_fingerprint
+                BEFORE UPDATE ON expense_attributes
+                FOR EACH ROW EXECUTE PROCEDURE expense_attributes_clear_fingerprint();
+
+                CREATE OR REPLACE FUNCTION destination_attributes_clear_fingerprint() RETURNS trigger AS $$
+                BEGIN
+                    IF NEW.fingerprint IS NOT DISTINCT FROM OLD.fingerprint
+                        AND (NEW.value, NEW.detail, NEW.active, NEW.code, NEW.destination_id)
+                            IS DISTINCT FROM (OLD.value, OLD.detail, OLD.active, OLD.code, OLD.destination_id) THEN
+                        NEW.fingerprint := NULL;
+                    END IF;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER destination_attributes_clear_fingerprint
+                BEFORE UPDATE ON destination_attributes
+                FOR EACH ROW EXECUTE PROCEDURE destination_attributes_clear_fingerprint();
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS expense_attributes_clear_fingerprint ON expense_attributes;
+                DROP FUNCTION IF EXISTS expense_attributes_clear_fingerprint();
+                DROP TRIGGER IF EXISTS destination_attributes_clear_fingerprint ON destination_attributes;
+                DROP FUNCTION IF EXISTS destination_attributes_clear_fingerprint();
+            """
+        ),
+    ]
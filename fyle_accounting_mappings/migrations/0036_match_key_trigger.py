@@ -0,0 +1,54 @@
+# Generated by Django 3.2 on 2026-10-17 10:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fyle_accounting_mappings', '0035_fingerprint_trigger'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION set_attribute_match_key() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' AND NEW.match_key IS NULL
+                        OR TG_OP = 'UPDATE' AND NEW.value IS DISTINCT FROM OLD.value
+                            AND NEW.match_key IS NOT DISTINCT FROM OLD.match_key THEN
+                        NEW.match_key := lower(btrim(regexp_replace(replace(NEW.value, '*', ''), '\\s+', ' ', 'g')));
+                    END IF;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER expense_attributes_set_match_key
+                BEFORE INSERT OR UPDATE ON expense_attributes
+                FOR EACH ROW EXECUTE PROCEDURE set_attribute_match_key();
+
+                CREATE TRIGGER destination_attributes_set_match_key
+                BEFORE INSERT OR UPDATE ON destination_attributes
+                FOR EACH ROW EXECUTE PROCEDURE set_attribute_match_key();
+
+                UPDATE expense_attributes
+                SET match_key = lower(btrim(regexp_replace(replace(value, '*', ''), '\\s+', ' ', 'g')))
+                WHERE match_key IS NULL;
+                UPDATE destination_attributes
+                SET match_key = lower(btrim(regexp_replace(replace(value, '*', ''), '\\s+', ' ', 'g')))
+                WHERE match_key IS NULL;
+
+                CREATE INDEX IF NOT EXISTS destination_attributes_email_match_key_idx
+                ON destination_attributes (
+                    workspace_id, attribute_type,
+                    (lower(btrim(regexp_replace(replace(detail ->> 'email', '*', ''), '\\s+', ' ', 'g'))))
+                );
+            """,
+            reverse_sql="""
+                DROP INDEX IF EXISTS destination_attributes_email_match_key_idx;
+                DROP TRIGGER IF EXISTS expense_attributes_set_match_key ON expense_attributes;
+                DROP TRIGGER IF EXISTS destination_attributes_set_match_key ON destination_attributes;
+                DROP FUNCTION IF EXISTS set_attribute_match_key();
+            """
+        ),
+    ]
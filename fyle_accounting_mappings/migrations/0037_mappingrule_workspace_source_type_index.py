@@ -0,0 +1,17 @@
+# Generated by Django 3.2 on 2026-10-17 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fyle_accounting_mappings', '0036_match_key_trigger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mappingrule',
+            index=models.Index(fields=['workspace', 'source_type'], name='mapping_rul_workspa_cb1673_idx'),
+        ),
+    ]
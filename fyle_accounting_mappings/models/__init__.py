@@ -0,0 +1,9 @@
+from .workspace import Workspace
+from .seen_ids import ExpenseAttributesSeenIds, DestinationAttributesSeenIds
+from .attributes import ExpenseAttributesDeletionCache, ExpenseAttribute, DestinationAttribute, ExpenseField, \
+    get_attribute_fingerprint, get_match_key
+from .sync_state import AttributeSyncState
+from .mappings import MappingSetting, Mapping, EmployeeMapping, CategoryMapping, MatchKey, MAPPING_SOURCE_FIELDS, \
+    validate_mapping_settings, create_mappings_and_update_flag, construct_mapping_payload, get_employee_match_key, \
+    filter_by_employee_match_keys, get_existing_source_ids, get_fuzzy_matches
+from .mapping_rules import MappingRule, MAPPING_RULE_TYPES
@@ -0,0 +1,802 @@
+import hashlib
+import json
+from typing import List, Dict, Iterable
+from datetime import datetime
+from django.utils.module_loading import import_string
+from django.db import connection, models, transaction
+from django.db.models import JSONField
+from django.contrib.postgres.fields import ArrayField
+
+from ..executor import BulkWriteExecutor
+from ..upsert import bulk_upsert, get_unique_attributes, iterate_windows
+
+from .seen_ids import DestinationAttributesSeenIds, ExpenseAttributesSeenIds
+from .workspace import Workspace
+
+
+def get_attribute_fingerprint(value: str, detail: dict = None, active: bool = None,
+                              code: str = None, source_id: str = None) -> str:
+    """
+    Hash of the synced content of an attribute, used to skip rewriting unchanged rows
+    :param value: Value of the attribute
+    :param detail: Detail of the attribute
+    :param active: Active flag of the attribute
+    :param code: Code of the attribute
+    :param source_id: Fyle ID / Destination ID of the attribute
+    :return: md5 hex digest
+    """
+    payload = json.dumps([value, detail, active, code, source_id], sort_keys=True, default=str)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def get_match_key(value: str) -> str:
+    """
+    Normalized value used for case insensitive matching, lower cased, without * and with whitespace collapsed
+    :param value: Value of the attribute
+    :return: match key
+    """
+    if value is None:
+        return None
+
+    return " ".join(value.replace('*', '').split()).lower()
+
+
+class ExpenseAttributesDeletionCache(models.Model):
+    """
+    Legacy seen source ids of category and project syncs, superseded by ExpenseAttributesSeenIds.
+    Ids left here are moved over by bulk_update_deleted_expense_attributes.
+    """
+    id = models.AutoField(primary_key=True)
+    category_ids = ArrayField(default=[], base_field=models.CharField(max_length=255))
+    project_ids = ArrayField(default=[], base_field=models.CharField(max_length=255))
+    workspace = models.OneToOneField(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+
+    class Meta:
+        db_table = 'expense_attributes_deletion_cache'
+
+
+class ExpenseAttribute(models.Model):
+    """
+    Fyle Expense Attributes
+    """
+    id = models.AutoField(primary_key=True)
+    attribute_type = models.CharField(max_length=255, help_text='Type of expense attribute')
+    display_name = models.CharField(max_length=255, help_text='Display name of expense attribute')
+    value = models.CharField(max_length=1000, help_text='Value of expense attribute')
+    source_id = models.CharField(max_length=255, help_text='Fyle ID')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    auto_mapped = models.BooleanField(default=False, help_text='Indicates whether the field is auto mapped or not')
+    auto_created = models.BooleanField(default=False,
+                                       help_text='Indicates whether the field is auto created by the integration')
+    active = models.BooleanField(null=True, help_text='Indicates whether the fields is active or not')
+    detail = JSONField(help_text='Detailed expense attributes payload', null=True)
+    fingerprint = models.CharField(
+        max_length=32, null=True, help_text='Hash of value, detail, active and source id of the attribute')
+    match_key = models.CharField(max_length=1000, null=True, help_text='Normalized value used for matching')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+    updated_at = models.DateTimeField(auto_now=True, help_text='Updated at datetime')
+
+    class Meta:
+        db_table = 'expense_attributes'
+        unique_together = ('value', 'attribute_type', 'workspace')
+        indexes = [
+            models.Index(fields=['workspace', 'attribute_type', 'match_key'])
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Override the save method to keep the match key and fingerprint in sync with the content.
+        """
+        self.match_key = get_match_key(self.value)
+        self.fingerprint = get_attribute_fingerprint(self.value, self.detail, self.active, source_id=self.source_id)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def create_or_update_expense_attribute(attribute: Dict, workspace_id):
+        """
+        Get or create expense attribute
+        """
+        expense_attribute, _ = ExpenseAttribute.objects.update_or_create(
+            attribute_type=attribute['attribute_type'],
+            value=attribute['value'],
+            workspace_id=workspace_id,
+            defaults={
+                'active': attribute['active'] if 'active' in attribute else None,
+                'source_id': attribute['source_id'],
+                'display_name': attribute['display_name'],
+                'detail': attribute['detail'] if 'detail' in attribute else None,
+                'fingerprint': get_attribute_fingerprint(
+                    attribute['value'],
+                    attribute['detail'] if 'detail' in attribute else None,
+                    attribute['active'] if 'active' in attribute else None,
+                    source_id=attribute['source_id']
+                )
+            }
+        )
+        return expense_attribute
+
+    @staticmethod
+    def bulk_update_deleted_expense_attributes(attribute_type: str, workspace_id: int, sync_run_id: str = '') -> int:
+        """
+        Bulk update deleted expense attributes, as a single anti join of the active attributes
+        against the source ids seen in the sync. Nothing is marked inactive when no ids were recorded for the sync.
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param sync_run_id: Identifier of the sync run the ids were recorded under
+        :return: number of attributes marked inactive
+        """
+        params = {'workspace_id': workspace_id, 'attribute_type': attribute_type, 'sync_run_id': sync_run_id}
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if attribute_type in ('CATEGORY', 'PROJECT'):
+                    # Moving ids still written to the legacy deletion cache into the seen ids store
+                    legacy_column = 'category_ids' if attribute_type == 'CATEGORY' else 'project_ids'
+                    cursor.execute("""
+                        INSERT INTO expense_attributes_seen_ids (attribute_type, sync_run_id, source_ids, workspace_id, created_at)
+                        SELECT %(attribute_type)s, %(sync_run_id)s, {0}, workspace_id, now()
+                        FROM expense_attributes_deletion_cache
+                        WHERE workspace_id = %(workspace_id)s AND cardinality({0}) > 0
+                    """.format(legacy_column), params)
+                    cursor.execute(
+                        "UPDATE expense_attributes_deletion_cache SET {0} = '{{}}' "
+                        "WHERE workspace_id = %(workspace_id)s AND cardinality({0}) > 0".format(legacy_column),
+                        params
+                    )
+
+                cursor.execute("""
+                    UPDATE expense_attributes ea
+                    SET active = false, fingerprint = NULL, updated_at = now()
+                    WHERE ea.workspace_id = %(workspace_id)s
+                        AND ea.attribute_type = %(attribute_type)s
+                        AND ea.active = true
+                        AND EXISTS (
+                            SELECT 1 FROM expense_attributes_seen_ids chunk
+                            WHERE chunk.workspace_id = %(workspace_id)s
+                                AND chunk.attribute_type = %(attribute_type)s
+                                AND chunk.sync_run_id = %(sync_run_id)s
+                        )
+                        AND NOT EXISTS (
+                            SELECT 1 FROM expense_attributes_seen_ids chunk, unnest(chunk.source_ids) AS seen(source_id)
+                            WHERE chunk.workspace_id = %(workspace_id)s
+                                AND chunk.attribute_type = %(attribute_type)s
+                                AND chunk.sync_run_id = %(sync_run_id)s
+                                AND seen.source_id = ea.source_id
+                        )
+                """, params)
+                deleted_attributes_count = cursor.rowcount
+
+                ExpenseAttributesSeenIds.objects.filter(
+                    workspace_id=workspace_id, attribute_type=attribute_type, sync_run_id=sync_run_id
+                ).delete()
+
+        return deleted_attributes_count
+
+    @staticmethod
+    def bulk_create_or_update_expense_attributes(
+            attributes: List[Dict], attribute_type: str, workspace_id: int,
+            update: bool = False) -> Dict[str, List[int]]:
+        """
+        Create Expense Attributes in bulk
+        :param update: Update Pre-existing records or not
+        :param attribute_type: Attribute type
+        :param attributes: attributes = [{
+            'attribute_type': Type of attribute,
+            'display_name': Display_name of attribute_field,
+            'value': Value of attribute,
+            'source_id': Fyle Id of the attribute,
+            'detail': Extra Details of the attribute
+        }]
+        :param workspace_id: Workspace Id
+        :return: {'created_ids': [...], 'updated_ids': [...]}
+        """
+        attribute_value_list = [attribute['value'] for attribute in attributes]
+
+        existing_attributes = ExpenseAttribute.objects.filter(
+            value__in=attribute_value_list, attribute_type=attribute_type,
+            workspace_id=workspace_id).values('id', 'value', 'fingerprint')
+
+        existing_attribute_values = []
+
+        primary_key_map = {}
+
+        for existing_attribute in existing_attributes:
+            existing_attribute_values.append(existing_attribute['value'])
+            primary_key_map[existing_attribute['value']] = {
+                'id': existing_attribute['id'],
+                'fingerprint': existing_attribute['fingerprint']
+            }
+
+        attributes_to_be_created = []
+        attributes_to_be_updated = []
+
+        values_appended = []
+        for attribute in attributes:
+            fingerprint = get_attribute_fingerprint(
+                attribute['value'],
+                attribute['detail'] if 'detail' in attribute else None,
+                attribute['active'] if 'active' in attribute else None,
+                source_id=attribute['source_id']
+            )
+
+            if attribute['value'] not in existing_attribute_values and attribute['value'] not in values_appended:
+                values_appended.append(attribute['value'])
+                attributes_to_be_created.append(
+                    ExpenseAttribute(
+                        attribute_type=attribute_type,
+                        display_name=attribute['display_name'],
+                        value=attribute['value'],
+                        source_id=attribute['source_id'],
+                        detail=attribute['detail'] if 'detail' in attribute else None,
+                        workspace_id=workspace_id,
+                        active=attribute['active'] if 'active' in attribute else None,
+                        match_key=get_match_key(attribute['value']),
+                        fingerprint=fingerprint
+                    )
+                )
+            else:
+                # Skipping rows whose content did not change since the last sync
+                if update and attribute['value'] in primary_key_map \
+                        and fingerprint != primary_key_map[attribute['value']]['fingerprint']:
+                    attributes_to_be_updated.append(
+                        ExpenseAttribute(
+                            id=primary_key_map[attribute['value']]['id'],
+                            source_id=attribute['source_id'],
+                            detail=attribute['detail'] if 'detail' in attribute else None,
+                            active=attribute['active'] if 'active' in attribute else None,
+                            fingerprint=fingerprint
+                        )
+                    )
+        with BulkWriteExecutor() as executor:
+            if attributes_to_be_created:
+                attributes_to_be_created = executor.bulk_create(ExpenseAttribute, attributes_to_be_created)
+
+            if attributes_to_be_updated:
+                executor.bulk_update(
+                    ExpenseAttribute, attributes_to_be_updated, fields=['source_id', 'detail', 'active', 'fingerprint'])
+
+        return {
+            'created_ids': [attribute.id for attribute in attributes_to_be_created],
+            'updated_ids': [attribute.id for attribute in attributes_to_be_updated]
+        }
+
+    @staticmethod
+    def construct_upsert_rows(attributes: List[Dict], attribute_type: str, workspace_id: int,
+                              update: bool = True) -> List[Dict]:
+        """
+        Construct upsert rows from attribute dicts, the last attribute of a repeated value wins when update is True
+        and the first one when update is False, like the upsert resolves values repeated across windows
+        :param attributes: Attribute dicts, same shape as bulk_upsert_expense_attributes
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param update: Update Pre-existing records or not
+        :return: rows for bulk_upsert
+        """
+        unique_attributes = get_unique_attributes(attributes, 'value', update)
+
+        return [
+            {
+                'attribute_type': attribute_type,
+                'display_name': attribute['display_name'],
+                'value': attribute['value'],
+                'source_id': attribute['source_id'],
+                'detail': attribute['detail'] if 'detail' in attribute else None,
+                'workspace': workspace_id,
+                'active': attribute['active'] if 'active' in attribute else None,
+                'match_key': get_match_key(attribute['value']),
+                'fingerprint': get_attribute_fingerprint(
+                    attribute['value'],
+                    attribute['detail'] if 'detail' in attribute else None,
+                    attribute['active'] if 'active' in attribute else None,
+                    source_id=attribute['source_id']
+                )
+            } for attribute in unique_attributes.values()
+        ]
+
+    @staticmethod
+    def bulk_upsert_expense_attributes(
+            attributes: List[Dict], attribute_type: str, workspace_id: int, update: bool = False) -> Dict[str, List[int]]:
+        """
+        Create / update Expense Attributes in bulk with INSERT ... ON CONFLICT on (value, attribute_type, workspace)
+        :param update: Update Pre-existing records or not
+        :param attribute_type: Attribute type
+        :param attributes: attributes = [{
+            'attribute_type': Type of attribute,
+            'display_name': Display_name of attribute_field,
+            'value': Value of attribute,
+            'source_id': Fyle Id of the attribute,
+            'detail': Extra Details of the attribute
+        }]
+        :param workspace_id: Workspace Id
+        :return: {'created_ids': [...], 'updated_ids': [...]}
+        """
+        rows = ExpenseAttribute.construct_upsert_rows(attributes, attribute_type, workspace_id, update)
+
+        return bulk_upsert(
+            ExpenseAttribute, rows, update_fields=['source_id', 'detail', 'active', 'fingerprint'],
+            update=update, change_fields=['fingerprint']
+        )
+
+    @staticmethod
+    def stream_upsert_expense_attributes(
+            attributes: Iterable[Dict], attribute_type: str, workspace_id: int,
+            update: bool = False, window_size: int = 1000, sync_run_id: str = None) -> Dict[str, int]:
+        """
+        Create / update Expense Attributes from an iterable, one window at a time, so memory stays
+        bounded by window_size. A value repeated within or across windows resolves the same way,
+        the first occurrence wins when update is False and the last one when update is True.
+        :param attributes: Iterable / generator of attribute dicts, same shape as bulk_upsert_expense_attributes
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param update: Update Pre-existing records or not
+        :param window_size: Attributes upserted per window
+        :param sync_run_id: Records the seen source ids under this sync run for deletion detection when given
+        :return: {'created': <count>, 'updated': <count>}
+        """
+        counts = {'created': 0, 'updated': 0}
+
+        for window in iterate_windows(attributes, window_size):
+            if sync_run_id is not None:
+                ExpenseAttributesSeenIds.append_source_ids(
+                    attribute_type, workspace_id, [attribute['source_id'] for attribute in window], sync_run_id)
+
+            result = ExpenseAttribute.bulk_upsert_expense_attributes(window, attribute_type, workspace_id, update)
+            counts['created'] += len(result['created_ids'])
+            counts['updated'] += len(result['updated_ids'])
+
+        return counts
+
+    @staticmethod
+    def get_last_synced_at(attribute_type: str, workspace_id: int):
+        """
+        Get last synced at datetime
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :return: last_synced_at datetime
+        """
+        return ExpenseAttribute.objects.filter(
+            workspace_id=workspace_id,
+            attribute_type=attribute_type
+        ).order_by('-updated_at').first()
+
+
+class DestinationAttribute(models.Model):
+    """
+    Destination Expense Attributes
+    """
+    id = models.AutoField(primary_key=True)
+    attribute_type = models.CharField(max_length=255, help_text='Type of expense attribute')
+    display_name = models.CharField(max_length=255, help_text='Display name of attribute')
+    value = models.CharField(max_length=255, help_text='Value of expense attribute')
+    destination_id = models.CharField(max_length=255, help_text='Destination ID')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    auto_created = models.BooleanField(default=False,
+                                       help_text='Indicates whether the field is auto created by the integration')
+    active = models.BooleanField(null=True, help_text='Indicates whether the fields is active or not')
+    detail = JSONField(help_text='Detailed destination attributes payload', null=True)
+    code = models.CharField(max_length=255, help_text='Code of the attribute', null=True)
+    fingerprint = models.CharField(
+        max_length=32, null=True, help_text='Hash of value, detail, active, code and destination id of the attribute')
+    match_key = models.CharField(max_length=255, null=True, help_text='Normalized value used for matching')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+    updated_at = models.DateTimeField(auto_now=True, help_text='Updated at datetime')
+
+    class Meta:
+        db_table = 'destination_attributes'
+        unique_together = ('destination_id', 'attribute_type', 'workspace', 'display_name')
+        indexes = [
+            models.Index(fields=['workspace', 'attribute_type', 'match_key'])
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Override the save method to keep the match key and fingerprint in sync with the content.
+        """
+        self.match_key = get_match_key(self.value)
+        self.fingerprint = get_attribute_fingerprint(
+            self.value, self.detail, self.active, self.code, self.destination_id)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def create_or_update_destination_attribute(attribute: Dict, workspace_id):
+        """
+        get or create destination attributes
+        """
+        destination_attribute, _ = DestinationAttribute.objects.update_or_create(
+            attribute_type=attribute['attribute_type'],
+            destination_id=attribute['destination_id'],
+            workspace_id=workspace_id,
+            defaults={
+                'active': attribute['active'] if 'active' in attribute else None,
+                'display_name': attribute['display_name'],
+                'value': attribute['value'],
+                'detail': attribute['detail'] if 'detail' in attribute else None,
+                'code': " ".join(attribute['code'].split()) if 'code' in attribute and attribute['code'] else None,
+                'fingerprint': get_attribute_fingerprint(
+                    attribute['value'],
+                    attribute['detail'] if 'detail' in attribute else None,
+                    attribute['active'] if 'active' in attribute else None,
+                    " ".join(attribute['code'].split()) if 'code' in attribute and attribute['code'] else None,
+                    attribute['destination_id']
+                )
+            }
+        )
+        return destination_attribute
+
+    @staticmethod
+    def bulk_create_or_update_destination_attributes(
+            attributes: List[Dict],
+            attribute_type: str,
+            workspace_id: int,
+            update: bool = False,
+            display_name: str = None,
+            attribute_disable_callback_path: str = None,
+            is_import_to_fyle_enabled: bool = False,
+            sync_run_id: str = None
+    ) -> Dict[str, List[int]]:
+        """
+        Create Destination Attributes in bulk
+        :param update: Update Pre-existing records or not
+        :param attribute_type: Attribute type
+        :param attributes: attributes = [{
+            'attribute_type': Type of attribute,
+            'display_name': Display_name of attribute_field,
+            'value': Value of attribute,
+            'destination_id': Destination Id of the attribute,
+            'detail': Extra Details of the attribute
+        }]
+        :param workspace_id: Workspace Id
+        :param attributes_disable_callback_path: API func to call when attribute is to be disabled
+        :param sync_run_id: Records the seen destination ids under this sync run for deletion detection when given
+        :return: {'created_ids': [...], 'updated_ids': [...]}
+        """
+        unique_attributes = {attribute['destination_id']: attribute for attribute in attributes}
+        attributes = list(unique_attributes.values())
+        attribute_destination_id_list = list(unique_attributes.keys())
+
+        if sync_run_id is not None:
+            DestinationAttributesSeenIds.append_destination_ids(
+                attribute_type, workspace_id, attribute_destination_id_list, sync_run_id)
+
+        filters = {
+            'destination_id__in': set(attribute_destination_id_list),
+            'attribute_type': attribute_type,
+            'workspace_id': workspace_id
+        }
+        if display_name:
+            filters['display_name'] = display_name
+
+        existing_attributes = DestinationAttribute.objects.filter(**filters)\
+            .values('id', 'value', 'destination_id', 'code', 'fingerprint')
+
+        existing_attribute_destination_ids = []
+
+        primary_key_map = {}
+
+        for existing_attribute in existing_attributes:
+            existing_attribute_destination_ids.append(existing_attribute['destination_id'])
+            primary_key_map[existing_attribute['destination_id']] = {
+                'id': existing_attribute['id'],
+                'value': existing_attribute['value'],
+                'code': existing_attribute['code'],
+                'fingerprint': existing_attribute['fingerprint']
+            }
+
+        attributes_to_be_created = []
+        attributes_to_be_updated = []
+        attributes_to_disable = {}
+
+        if attribute_disable_callback_path and is_import_to_fyle_enabled:
+            attributes_to_disable = DestinationAttribute.get_attributes_to_disable(
+                unique_attributes, existing_attributes)
+
+        destination_ids_appended = []
+        for attribute in attributes:
+            code = " ".join(attribute['code'].split()) if 'code' in attribute and attribute['code'] else None
+            fingerprint = get_attribute_fingerprint(
+                attribute['value'],
+                attribute['detail'] if 'detail' in attribute else None,
+                attribute['active'] if 'active' in attribute else None,
+                code,
+                attribute['destination_id']
+            )
+
+            if attribute['destination_id'] not in existing_attribute_destination_ids \
+                    and attribute['destination_id'] not in destination_ids_appended:
+                destination_ids_appended.append(attribute['destination_id'])
+                attributes_to_be_created.append(
+                    DestinationAttribute(
+                        attribute_type=attribute_type,
+                        display_name=attribute['display_name'],
+                        value=attribute['value'],
+                        destination_id=attribute['destination_id'],
+                        detail=attribute['detail'] if 'detail' in attribute else None,
+                        workspace_id=workspace_id,
+                        active=attribute['active'] if 'active' in attribute else None,
+                        code=code,
+                        match_key=get_match_key(attribute['value']),
+                        fingerprint=fingerprint
+                    )
+                )
+            else:
+                # Skipping rows whose content did not change since the last sync
+                if update and fingerprint != primary_key_map[attribute['destination_id']]['fingerprint']:
+                    attributes_to_be_updated.append(
+                        DestinationAttribute(
+                            id=primary_key_map[attribute['destination_id']]['id'],
+                            value=attribute['value'],
+                            detail=attribute['detail'] if 'detail' in attribute else None,
+                            active=attribute['active'] if 'active' in attribute else None,
+                            code=code,
+                            match_key=get_match_key(attribute['value']),
+                            fingerprint=fingerprint,
+                            updated_at=datetime.now()
+                        )
+                    )
+
+        if attribute_disable_callback_path and attributes_to_disable:
+            import_string(attribute_disable_callback_path)(workspace_id, attributes_to_disable, is_import_to_fyle_enabled)
+
+        with BulkWriteExecutor() as executor:
+            if attributes_to_be_created:
+                attributes_to_be_created = executor.bulk_create(DestinationAttribute, attributes_to_be_created)
+
+            if attributes_to_be_updated:
+                executor.bulk_update(
+                    DestinationAttribute, attributes_to_be_updated,
+                    fields=['detail', 'value', 'active', 'updated_at', 'code', 'match_key', 'fingerprint']
+                )
+
+        return {
+            'created_ids': [attribute.id for attribute in attributes_to_be_created],
+            'updated_ids': [attribute.id for attribute in attributes_to_be_updated]
+        }
+
+    @staticmethod
+    def get_attributes_to_disable(unique_attributes: Dict[str, Dict], existing_attributes: Iterable[Dict]) -> Dict:
+        """
+        Get the existing attributes whose value or code changed, to be disabled by the disable callback
+        :param unique_attributes: Incoming attribute dicts keyed by destination_id
+        :param existing_attributes: Existing rows with destination_id, value and code
+        :return: {<destination_id>: {'value', 'updated_value', 'code', 'updated_code'}}
+        """
+        attributes_to_disable = {}
+
+        for existing_attribute in existing_attributes:
+            attribute = unique_attributes[existing_attribute['destination_id']]
+            value_changed = attribute['value'] and existing_attribute['value'] \
+                and attribute['value'].lower() != existing_attribute['value'].lower()
+            code_changed = 'code' in attribute and attribute['code'] and attribute['code'] != existing_attribute['code']
+
+            if value_changed or code_changed:
+                attributes_to_disable[existing_attribute['destination_id']] = {
+                    'value': existing_attribute['value'],
+                    'updated_value': attribute['value'],
+                    'code': existing_attribute['code'],
+                    'updated_code': attribute['code']
+                }
+
+        return attributes_to_disable
+
+    @staticmethod
+    def construct_upsert_rows(attributes: Iterable[Dict], attribute_type: str, workspace_id: int,
+                              update: bool = True) -> List[Dict]:
+        """
+        Construct upsert rows from attribute dicts, the last attribute of a repeated destination_id wins when update
+        is True and the first one when update is False, like the upsert resolves ids repeated across windows
+        :param attributes: Attribute dicts, same shape as bulk_upsert_destination_attributes
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param update: Update Pre-existing records or not
+        :return: rows for bulk_upsert
+        """
+        unique_attributes = get_unique_attributes(attributes, 'destination_id', update)
+
+        rows = []
+        for attribute in unique_attributes.values():
+            code = " ".join(attribute['code'].split()) if 'code' in attribute and attribute['code'] else None
+            rows.append({
+                'attribute_type': attribute_type,
+                'display_name': attribute['display_name'],
+                'value': attribute['value'],
+                'destination_id': attribute['destination_id'],
+                'detail': attribute['detail'] if 'detail' in attribute else None,
+                'workspace': workspace_id,
+                'active': attribute['active'] if 'active' in attribute else None,
+                'code': code,
+                'match_key': get_match_key(attribute['value']),
+                'fingerprint': get_attribute_fingerprint(
+                    attribute['value'],
+                    attribute['detail'] if 'detail' in attribute else None,
+                    attribute['active'] if 'active' in attribute else None,
+                    code,
+                    attribute['destination_id']
+                )
+            })
+
+        return rows
+
+    @staticmethod
+    def bulk_upsert_destination_attributes(
+            attributes: List[Dict],
+            attribute_type: str,
+            workspace_id: int,
+            update: bool = False,
+            display_name: str = None,
+            attribute_disable_callback_path: str = None,
+            is_import_to_fyle_enabled: bool = False,
+            sync_run_id: str = None
+    ) -> Dict[str, List[int]]:
+        """
+        Create / update Destination Attributes in bulk with
+        INSERT ... ON CONFLICT on (destination_id, attribute_type, workspace, display_name)
+        :param update: Update Pre-existing records or not
+        :param attribute_type: Attribute type
+        :param attributes: attributes = [{
+            'attribute_type': Type of attribute,
+            'display_name': Display_name of attribute_field,
+            'value': Value of attribute,
+            'destination_id': Destination Id of the attribute,
+            'detail': Extra Details of the attribute
+        }]
+        :param workspace_id: Workspace Id
+        :param display_name: Display name to restrict the attributes to
+        :param attributes_disable_callback_path: API func to call when attribute is to be disabled
+        :param sync_run_id: Records the seen destination ids under this sync run for deletion detection when given
+        :return: {'created_ids': [...], 'updated_ids': [...]}
+        """
+        unique_attributes = get_unique_attributes(attributes, 'destination_id', update)
+
+        if sync_run_id is not None:
+            DestinationAttributesSeenIds.append_destination_ids(
+                attribute_type, workspace_id, list(unique_attributes.keys()), sync_run_id)
+
+        if attribute_disable_callback_path and is_import_to_fyle_enabled:
+            filters = {
+                'destination_id__in': list(unique_attributes.keys()),
+                'attribute_type': attribute_type,
+                'workspace_id': workspace_id
+            }
+            if display_name:
+                filters['display_name'] = display_name
+
+            existing_attributes = DestinationAttribute.objects.filter(**filters).values('destination_id', 'value', 'code')
+            attributes_to_disable = DestinationAttribute.get_attributes_to_disable(
+                unique_attributes, existing_attributes)
+
+            if attributes_to_disable:
+                import_string(attribute_disable_callback_path)(workspace_id, attributes_to_disable, is_import_to_fyle_enabled)
+
+        rows = DestinationAttribute.construct_upsert_rows(unique_attributes.values(), attribute_type, workspace_id)
+
+        return bulk_upsert(
+            DestinationAttribute, rows, update_fields=['value', 'detail', 'active', 'code', 'match_key', 'fingerprint'],
+            update=update, change_fields=['fingerprint']
+        )
+
+    @staticmethod
+    def stream_upsert_destination_attributes(
+            attributes: Iterable[Dict],
+            attribute_type: str,
+            workspace_id: int,
+            update: bool = False,
+            display_name: str = None,
+            attribute_disable_callback_path: str = None,
+            is_import_to_fyle_enabled: bool = False,
+            window_size: int = 1000,
+            sync_run_id: str = None
+    ) -> Dict[str, int]:
+        """
+        Create / update Destination Attributes from an iterable, one window at a time, so memory stays
+        bounded by window_size. A destination_id repeated within or across windows resolves the same way,
+        the first occurrence wins when update is False and the last one when update is True.
+        :param attributes: Iterable / generator of attribute dicts, same shape as bulk_upsert_destination_attributes
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param update: Update Pre-existing records or not
+        :param display_name: Display name to restrict the attributes to
+        :param attributes_disable_callback_path: API func to call when attribute is to be disabled
+        :param window_size: Attributes upserted per window
+        :param sync_run_id: Records the seen destination ids under this sync run for deletion detection when given
+        :return: {'created': <count>, 'updated': <count>}
+        """
+        counts = {'created': 0, 'updated': 0}
+
+        for window in iterate_windows(attributes, window_size):
+            result = DestinationAttribute.bulk_upsert_destination_attributes(
+                window, attribute_type, workspace_id, update, display_name,
+                attribute_disable_callback_path, is_import_to_fyle_enabled, sync_run_id
+            )
+            counts['created'] += len(result['created_ids'])
+            counts['updated'] += len(result['updated_ids'])
+
+        return counts
+
+    @staticmethod
+    def bulk_update_deleted_destination_attributes(attribute_type: str, workspace_id: int, sync_run_id: str = '',
+                                                   display_name: str = None) -> int:
+        """
+        Mark destination attributes missing from a full sync inactive, as a single anti join of the active
+        attributes against the destination ids seen in the sync. Nothing is marked inactive when no ids
+        were recorded for the sync.
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param sync_run_id: Identifier of the sync run the ids were recorded under
+        :param display_name: Display name to restrict the attributes to
+        :return: number of attributes marked inactive
+        """
+        params = {
+            'workspace_id': workspace_id,
+            'attribute_type': attribute_type,
+            'sync_run_id': sync_run_id,
+            'display_name': display_name
+        }
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE destination_attributes da
+                    SET active = false, fingerprint = NULL, updated_at = now()
+                    WHERE da.workspace_id = %(workspace_id)s
+                        AND da.attribute_type = %(attribute_type)s
+                        AND da.active = true
+                        AND (%(display_name)s::varchar IS NULL OR da.display_name = %(display_name)s)
+                        AND EXISTS (
+                            SELECT 1 FROM destination_attributes_seen_ids chunk
+                            WHERE chunk.workspace_id = %(workspace_id)s
+                                AND chunk.attribute_type = %(attribute_type)s
+                                AND chunk.sync_run_id = %(sync_run_id)s
+                        )
+                        AND NOT EXISTS (
+                            SELECT 1 FROM destination_attributes_seen_ids chunk, unnest(chunk.destination_ids) AS seen(destination_id)
+                            WHERE chunk.workspace_id = %(workspace_id)s
+                                AND chunk.attribute_type = %(attribute_type)s
+                                AND chunk.sync_run_id = %(sync_run_id)s
+                                AND seen.destination_id = da.destination_id
+                        )
+                """, params)
+                deleted_attributes_count = cursor.rowcount
+
+                DestinationAttributesSeenIds.objects.filter(
+                    workspace_id=workspace_id, attribute_type=attribute_type, sync_run_id=sync_run_id
+                ).delete()
+
+        return deleted_attributes_count
+
+
+class ExpenseField(models.Model):
+    """
+    Expense Fields
+    """
+
+    id = models.AutoField(primary_key=True)
+    attribute_type = models.CharField(max_length=255, help_text='Attribute Type')
+    source_field_id = models.IntegerField(help_text='Field ID')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    is_enabled = models.BooleanField(default=False, help_text='Is the field Enabled')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+    updated_at = models.DateTimeField(auto_now=True, help_text='Updated at datetime')
+
+    class Meta:
+        db_table = 'expense_fields'
+        unique_together = ('attribute_type', 'workspace_id')
+
+    @staticmethod
+    def create_or_update_expense_fields(attributes: List[Dict], fields_included: List[str], workspace_id):
+        """
+        Update or Create Expense Fields
+        """
+        # Looping over Expense Field Values
+        expense_fields = None
+        for expense_field in attributes:
+            if expense_field['field_name'] in fields_included or expense_field['type'] == 'DEPENDENT_SELECT':
+                expense_fields, _ = ExpenseField.objects.update_or_create(
+                    attribute_type=expense_field['field_name'].replace(' ', '_').upper(),
+                    workspace_id=workspace_id,
+                    defaults={
+                        'source_field_id': expense_field['id'],
+                        'is_enabled': expense_field['is_enabled'] if 'is_enabled' in expense_field else False
+                    }
+                )
+
+        return expense_fields
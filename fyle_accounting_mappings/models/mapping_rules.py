@@ -0,0 +1,36 @@
+from django.db import models
+
+from .attributes import DestinationAttribute
+from .workspace import Workspace
+
+MAPPING_RULE_TYPES = (
+    ('EXACT', 'EXACT'),
+    ('PREFIX', 'PREFIX'),
+    ('CONTAINS', 'CONTAINS'),
+    ('REGEX', 'REGEX')
+)
+
+
+class MappingRule(models.Model):
+    """
+    Mapping Rules, map the source attributes whose value matches a pattern to a destination attribute
+    """
+    id = models.AutoField(primary_key=True)
+    source_type = models.CharField(max_length=255, help_text='Type of source attribute, eg. PROJECT')
+    rule_type = models.CharField(
+        max_length=255, choices=MAPPING_RULE_TYPES, help_text='How the pattern is matched against the source value')
+    pattern = models.CharField(max_length=1000, help_text='Pattern matched against the source value, ignoring case')
+    destination = models.ForeignKey(
+        DestinationAttribute, on_delete=models.PROTECT, related_name='mapping_rules',
+        help_text='Destination attribute the matching source attributes are mapped to')
+    priority = models.IntegerField(default=0, help_text='Rules with a lower priority win when several rules match')
+    is_enabled = models.BooleanField(default=True, help_text='Is the rule Enabled')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+    updated_at = models.DateTimeField(auto_now=True, help_text='Updated at datetime')
+
+    class Meta:
+        db_table = 'mapping_rules'
+        indexes = [
+            models.Index(fields=['workspace', 'source_type'])
+        ]
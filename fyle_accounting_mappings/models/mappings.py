@@ -0,0 +1,864 @@
+from typing import List, Dict, Iterable, Set
+from datetime import datetime
+from django.db import connection, models, transaction
+from django.db.models import Func, QuerySet
+from django.db.models.fields.json import KeyTextTransform
+
+from ..exceptions import BulkError
+from ..utils import assert_valid, iterate_by_keyset
+from ..executor import BulkWriteExecutor
+from ..fuzzy import FuzzyMatcher
+from ..upsert import build_upsert_statement, get_conflict_fields
+
+from ..mixins import AutoAddCreateUpdateInfoMixin
+from .attributes import DestinationAttribute, ExpenseAttribute, ExpenseField, get_match_key
+from .workspace import Workspace
+
+# Field pointing at the expense attribute a mapping table maps
+MAPPING_SOURCE_FIELDS = {
+    'mappings': 'source',
+    'category_mappings': 'source_category',
+    'employee_mappings': 'source_employee'
+}
+
+
+def validate_mapping_settings(mappings_settings: List[Dict]):
+    bulk_errors = []
+
+    row = 0
+
+    for mappings_setting in mappings_settings:
+        if ('source_field' not in mappings_setting) and (not mappings_setting['source_field']):
+            bulk_errors.append({
+                'row': row,
+                'value': None,
+                'message': 'source field cannot be empty'
+            })
+
+        if ('destination_field' not in mappings_setting) and (not mappings_setting['destination_field']):
+            bulk_errors.append({
+                'row': row,
+                'value': None,
+                'message': 'destination field cannot be empty'
+            })
+
+        row = row + 1
+
+    if bulk_errors:
+        raise BulkError('Errors while creating settings', bulk_errors)
+
+
+def create_mappings_and_update_flag(mapping_batch: list, set_auto_mapped_flag: bool = True, **kwargs):
+    """
+    Create mappings and set auto_mapped on their source attributes in the same statement,
+    as an INSERT wrapped in a CTE that updates the expense attributes it returned
+    :param mapping_batch: Unsaved Mapping / CategoryMapping / EmployeeMapping instances, one per source attribute
+    :param set_auto_mapped_flag: set auto mapped to expense attributes
+    :param kwargs: model_type, defaults to Mapping, and executor to run the statements in
+    :return: created mappings, with their ids set
+    """
+    model_type = kwargs['model_type'] if 'model_type' in kwargs else Mapping
+    if not mapping_batch:
+        return []
+
+    meta = model_type._meta
+    source_field = meta.get_field(MAPPING_SOURCE_FIELDS[meta.db_table])
+    quote_name = connection.ops.quote_name
+
+    if meta.unique_together:
+        conflict_fields = get_conflict_fields(model_type)
+    else:
+        conflict_fields = [source_field.name] if source_field.unique else []
+
+    fields = [
+        field for field in meta.concrete_fields
+        if not field.primary_key and not getattr(field, 'auto_now', False) and not getattr(field, 'auto_now_add', False)
+    ]
+    source_ids = {}
+
+    def write_batch(batch: list) -> list:
+        rows = [{field.name: getattr(mapping, field.attname) for field in fields} for mapping in batch]
+        sql, params = build_upsert_statement(
+            model_type, rows, conflict_fields, [], update=False, returning_fields=[source_field.name])
+
+        if set_auto_mapped_flag:
+            # The update sees the inserted rows only through RETURNING, sibling CTEs share one snapshot
+            sql = """
+                WITH inserted AS ({0}),
+                flagged AS (
+                    UPDATE expense_attributes ea SET auto_mapped = true
+                    FROM inserted WHERE ea.id = inserted.{1}
+                )
+                SELECT * FROM inserted
+            """.format(sql, quote_name(source_field.column))
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    label = 'create_and_flag:{0}'.format(meta.db_table)
+    if 'executor' in kwargs and kwargs['executor']:
+        results = kwargs['executor'].run(label, mapping_batch, write_batch)
+    else:
+        with BulkWriteExecutor() as executor:
+            results = executor.run(label, mapping_batch, write_batch)
+
+    for primary_key, _, source_id in results:
+        source_ids[source_id] = primary_key
+
+    mappings = []
+    for mapping in mapping_batch:
+        source_id = getattr(mapping, source_field.attname)
+        if source_id in source_ids:
+            mapping.id = source_ids[source_id]
+            mapping._state.adding = False
+            mappings.append(mapping)
+
+    return mappings
+
+
+def construct_mapping_payload(employee_source_attributes: Iterable, employee_mapping_preference: str,
+                              destination_id_value_map: dict, destination_type: str, workspace_id: int):
+    existing_source_ids = get_existing_source_ids(destination_type, workspace_id)
+
+    mapping_batch = []
+    for source_attribute in employee_source_attributes:
+        if source_attribute.id not in existing_source_ids:
+            # Checking exact match
+            source_match_key = get_employee_match_key(source_attribute, employee_mapping_preference)
+            if source_match_key in destination_id_value_map:
+                destination_id = destination_id_value_map[source_match_key]
+                mapping_batch.append(
+                    Mapping(
+                        source_type='EMPLOYEE',
+                        destination_type=destination_type,
+                        source_id=source_attribute.id,
+                        destination_id=destination_id,
+                        workspace_id=workspace_id
+                    )
+                )
+
+    return mapping_batch
+
+
+def get_employee_match_key(source_attribute: 'ExpenseAttribute', employee_mapping_preference: str) -> str:
+    """
+    Get the match key of an employee source attribute for a mapping preference
+    :param source_attribute: Employee expense attribute
+    :param employee_mapping_preference: EMAIL / NAME / EMPLOYEE_CODE
+    :return: match key
+    """
+    if employee_mapping_preference == 'EMAIL':
+        return get_match_key(source_attribute.value)
+    elif employee_mapping_preference == 'NAME':
+        return get_match_key(source_attribute.detail['full_name'] if source_attribute.detail else None)
+    elif employee_mapping_preference == 'EMPLOYEE_CODE':
+        return get_match_key(source_attribute.detail['employee_code'] if source_attribute.detail else None)
+
+    return None
+
+
+class MatchKey(Func):
+    """
+    SQL counterpart of get_match_key, the expression of the email match key index of destination attributes
+    """
+    template = "lower(btrim(regexp_replace(replace(%(expressions)s, '*', ''), '\\s+', ' ', 'g')))"
+    output_field = models.CharField()
+
+
+def filter_by_employee_match_keys(queryset: QuerySet, employee_mapping_preference: str,
+                                  match_keys: Iterable[str]) -> QuerySet:
+    """
+    Restrict employee destination attributes to the ones a set of source match keys can match
+    :param queryset: Destination attributes queryset
+    :param employee_mapping_preference: EMAIL / NAME / EMPLOYEE_CODE
+    :param match_keys: Match keys of the source attributes
+    :return: filtered queryset
+    """
+    match_keys = [match_key for match_key in match_keys if match_key]
+
+    if employee_mapping_preference == 'EMAIL':
+        return queryset.annotate(
+            email_match_key=MatchKey(KeyTextTransform('email', 'detail'))
+        ).filter(email_match_key__in=match_keys)
+
+    return queryset.filter(match_key__in=match_keys)
+
+
+def get_existing_source_ids(destination_type: str, workspace_id: int) -> Set[int]:
+    """
+    Get the ids of the employee source attributes already mapped to a destination type, in a single query
+    :param destination_type: Destination Type of mappings
+    :param workspace_id: Workspace Id
+    :return: set of source attribute ids
+    """
+    return set(
+        Mapping.objects.filter(
+            source_type='EMPLOYEE', destination_type=destination_type, workspace_id=workspace_id
+        ).values_list('source_id', flat=True)
+    )
+
+
+def get_fuzzy_matches(fuzzy_matcher: FuzzyMatcher, source_attributes: QuerySet,
+                      destination_attributes: List['DestinationAttribute'],
+                      matched_source_ids: Iterable[int]) -> List[tuple]:
+    """
+    Match the unmapped source attributes exact matching left over to their most similar destination attribute
+    :param fuzzy_matcher: Fuzzy matcher
+    :param source_attributes: Unmapped source attributes queryset
+    :param destination_attributes: Destination Attributes List
+    :param matched_source_ids: Ids of the source attributes already matched exactly
+    :return: [(<source attribute id>, <destination attribute id>)]
+    """
+    matched_source_ids = set(matched_source_ids)
+    source_ids, source_values = [], []
+    for source_id, value in source_attributes.values_list('id', 'value'):
+        if source_id not in matched_source_ids:
+            source_ids.append(source_id)
+            source_values.append(value)
+
+    return fuzzy_matcher.match(
+        source_ids, source_values,
+        [destination_attribute.id for destination_attribute in destination_attributes],
+        [destination_attribute.value for destination_attribute in destination_attributes]
+    )
+
+
+class MappingSetting(AutoAddCreateUpdateInfoMixin, models.Model):
+    """
+    Mapping Settings
+    """
+    id = models.AutoField(primary_key=True)
+    source_field = models.CharField(max_length=255, help_text='Source mapping field')
+    destination_field = models.CharField(max_length=255, help_text='Destination mapping field')
+    import_to_fyle = models.BooleanField(default=False, help_text='Import to Fyle or not')
+    is_custom = models.BooleanField(default=False, help_text='Custom Field or not')
+    source_placeholder = models.TextField(help_text='placeholder of source field', null=True)
+    expense_field = models.ForeignKey(
+        ExpenseField, on_delete=models.PROTECT, help_text='Reference to Expense Field model',
+        related_name='expense_fields', null=True
+    )
+    workspace = models.ForeignKey(
+        Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model',
+        related_name='mapping_settings'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+    updated_at = models.DateTimeField(auto_now=True, help_text='Updated at datetime')
+
+    class Meta:
+        unique_together = ('source_field', 'destination_field', 'workspace')
+        db_table = 'mapping_settings'
+
+    @staticmethod
+    def bulk_upsert_mapping_setting(settings: List[Dict], workspace_id: int):
+        """
+        Bulk update or create mapping setting
+        """
+        validate_mapping_settings(settings)
+        mapping_settings = []
+
+        with transaction.atomic():
+            for setting in settings:
+
+                mapping_setting, _ = MappingSetting.objects.update_or_create(
+                    source_field=setting['source_field'],
+                    workspace_id=workspace_id,
+                    destination_field=setting['destination_field'],
+                    expense_field_id=setting['parent_field'] if 'parent_field' in setting else None,
+                    defaults={
+                        'import_to_fyle': setting['import_to_fyle'] if 'import_to_fyle' in setting else False,
+                        'is_custom': setting['is_custom'] if 'is_custom' in setting else False
+                    }
+                )
+                mapping_settings.append(mapping_setting)
+
+            return mapping_settings
+
+
+class Mapping(models.Model):
+    """
+    Mappings
+    """
+    id = models.AutoField(primary_key=True)
+    source_type = models.CharField(max_length=255, help_text='Fyle Enum')
+    destination_type = models.CharField(max_length=255, help_text='Destination Enum')
+    source = models.ForeignKey(ExpenseAttribute, on_delete=models.PROTECT, related_name='mapping')
+    destination = models.ForeignKey(DestinationAttribute, on_delete=models.PROTECT, related_name='mapping')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+    updated_at = models.DateTimeField(auto_now=True, help_text='Updated at datetime')
+
+    class Meta:
+        unique_together = ('source_type', 'source', 'destination_type', 'workspace')
+        db_table = 'mappings'
+
+    @staticmethod
+    def create_or_update_mapping(source_type: str, destination_type: str,
+                                 source_value: str, destination_value: str, destination_id: str, workspace_id: int):
+        """
+        Bulk update or create mappings
+        source_type = 'Type of Source attribute, eg. CATEGORY',
+        destination_type = 'Type of Destination attribute, eg. ACCOUNT',
+        source_value = 'Source value to be mapped, eg. category name',
+        destination_value = 'Destination value to be mapped, eg. account name'
+        workspace_id = Unique Workspace id
+        """
+        settings = MappingSetting.objects.filter(source_field=source_type, destination_field=destination_type,
+                                                 workspace_id=workspace_id).first()
+
+        assert_valid(
+            settings is not None and settings != [],
+            'Settings for Destination  {0} / Source {1} not found'.format(destination_type, source_type)
+        )
+
+        mapping, _ = Mapping.objects.update_or_create(
+            source_type=source_type,
+            source=ExpenseAttribute.objects.filter(
+                attribute_type=source_type, match_key=get_match_key(source_value), workspace_id=workspace_id
+            ).first() if source_value else None,
+            destination_type=destination_type,
+            workspace=Workspace.objects.get(pk=workspace_id),
+            defaults={
+                'destination': DestinationAttribute.objects.get(
+                    attribute_type=destination_type,
+                    value=destination_value,
+                    destination_id=destination_id,
+                    workspace_id=workspace_id
+                )
+            }
+        )
+        return mapping
+
+    @staticmethod
+    def bulk_create_mappings(destination_attributes: List[DestinationAttribute], source_type: str,
+                             destination_type: str, workspace_id: int, set_auto_mapped_flag: bool = True,
+                             fuzzy_matcher: FuzzyMatcher = None):
+        """
+        Bulk create mappings
+        :param set_auto_mapped_flag: set auto mapped to expense attributes
+        :param destination_type: Destination Type
+        :param source_type: Source Type
+        :param destination_attributes: Destination Attributes List
+        :param workspace_id: workspace_id
+        :param fuzzy_matcher: Also map the source attributes without an exact match to their most similar destination,
+            not for EMPLOYEE sources whose values are emails
+        :return: mappings list
+        """
+        assert_valid(
+            fuzzy_matcher is None or source_type != 'EMPLOYEE',
+            'Fuzzy matching is not supported for EMPLOYEE source attributes'
+        )
+
+        attribute_match_key_list = []
+
+        for destination_attribute in destination_attributes:
+            attribute_match_key_list.append(get_match_key(destination_attribute.value))
+
+        source_attributes = ExpenseAttribute.objects.filter(
+            match_key__in=attribute_match_key_list, workspace_id=workspace_id,
+            attribute_type=source_type, mapping__source_id__isnull=True).values('id', 'match_key')
+
+        source_value_id_map = {}
+
+        for source_attribute in source_attributes:
+            source_value_id_map[source_attribute['match_key']] = source_attribute['id']
+
+        mapping_batch = []
+
+        for destination_attribute, match_key in zip(destination_attributes, attribute_match_key_list):
+            if match_key in source_value_id_map:
+                mapping_batch.append(
+                    Mapping(
+                        source_type=source_type,
+                        destination_type=destination_type,
+                        source_id=source_value_id_map[match_key],
+                        destination_id=destination_attribute.id,
+                        workspace_id=workspace_id
+                    )
+                )
+
+        if fuzzy_matcher:
+            mapping_batch.extend(
+                Mapping(
+                    source_type=source_type,
+                    destination_type=destination_type,
+                    source_id=source_id,
+                    destination_id=destination_id,
+                    workspace_id=workspace_id
+                ) for source_id, destination_id in get_fuzzy_matches(
+                    fuzzy_matcher,
+                    ExpenseAttribute.objects.filter(
+                        workspace_id=workspace_id, attribute_type=source_type, mapping__source_id__isnull=True),
+                    destination_attributes,
+                    [mapping.source_id for mapping in mapping_batch]
+                )
+            )
+
+        return create_mappings_and_update_flag(mapping_batch, set_auto_mapped_flag)
+
+    @staticmethod
+    def auto_map_workspace(workspace_id: int, set_auto_mapped_flag: bool = True) -> List['Mapping']:
+        """
+        Auto map every mapping setting of a workspace at once, the single pass equivalent of calling
+        bulk_create_mappings with the destination attributes of each setting, less the inactive ones, in setting order.
+        Employee settings are left out, they are matched on a mapping preference by EmployeesAutoMappingHelper.
+        :param workspace_id: Workspace Id
+        :param set_auto_mapped_flag: set auto mapped to expense attributes
+        :return: mappings list
+        """
+        mapping_settings = list(
+            MappingSetting.objects.filter(workspace_id=workspace_id).exclude(
+                source_field='EMPLOYEE'
+            ).order_by('id').values_list('source_field', 'destination_field')
+        )
+        if not mapping_settings:
+            return []
+
+        source_types = {source_type for source_type, _ in mapping_settings}
+        destination_types = {destination_type for _, destination_type in mapping_settings}
+
+        destination_match_keys = {destination_type: [] for destination_type in destination_types}
+        for destination_id, attribute_type, value in DestinationAttribute.objects.filter(
+                workspace_id=workspace_id, attribute_type__in=destination_types
+        ).exclude(active=False).order_by('id').values_list('id', 'attribute_type', 'value'):
+            destination_match_keys[attribute_type].append((destination_id, get_match_key(value)))
+
+        source_value_id_maps = {source_type: {} for source_type in source_types}
+        for source_id, attribute_type, match_key in ExpenseAttribute.objects.filter(
+                workspace_id=workspace_id, attribute_type__in=source_types, mapping__source_id__isnull=True
+        ).order_by('id').values_list('id', 'attribute_type', 'match_key'):
+            if match_key:
+                source_value_id_maps[attribute_type][match_key] = source_id
+
+        mapping_batch = []
+        # A source mapped by an earlier setting or destination is no longer unmapped for the later ones
+        mapped_source_ids = set()
+
+        for source_type, destination_type in mapping_settings:
+            source_value_id_map = source_value_id_maps[source_type]
+
+            for destination_id, match_key in destination_match_keys[destination_type]:
+                if match_key not in source_value_id_map:
+                    continue
+
+                source_id = source_value_id_map[match_key]
+                if source_id in mapped_source_ids:
+                    continue
+
+                mapped_source_ids.add(source_id)
+                mapping_batch.append(
+                    Mapping(
+                        source_type=source_type,
+                        destination_type=destination_type,
+                        source_id=source_id,
+                        destination_id=destination_id,
+                        workspace_id=workspace_id
+                    )
+                )
+
+        return create_mappings_and_update_flag(mapping_batch, set_auto_mapped_flag)
+
+    @staticmethod
+    def auto_map_by_value(source_type: str, destination_type: str, workspace_id: int,
+                          destination_attribute_ids: List[int] = None, set_auto_mapped_flag: bool = True,
+                          source_attribute_ids: List[int] = None) -> int:
+        """
+        Auto map unmapped source attributes to destination attributes of the same match key that are not inactive,
+        with a single INSERT ... SELECT joining both attribute tables in the database
+        :param source_type: Source Type
+        :param destination_type: Destination Type
+        :param workspace_id: Workspace Id
+        :param destination_attribute_ids: Restrict the match to these destination attributes, all when not given
+        :param set_auto_mapped_flag: set auto mapped to expense attributes
+        :param source_attribute_ids: Restrict the match to these source attributes, e.g. the ids returned by an upsert
+        :return: number of mappings created
+        """
+        params = {
+            'source_type': source_type,
+            'destination_type': destination_type,
+            'workspace_id': workspace_id,
+            'destination_attribute_ids': destination_attribute_ids,
+            'source_attribute_ids': source_attribute_ids
+        }
+
+        destination_filter = 'AND da.id = ANY(%(destination_attribute_ids)s)' \
+            if destination_attribute_ids is not None else ''
+        if source_attribute_ids is not None:
+            destination_filter += ' AND ea.id = ANY(%(source_attribute_ids)s)'
+        # Data modifying CTEs run even when not referenced, the flag update sees the rows inserted above it
+        flag_update = """
+            , flagged AS (
+                UPDATE expense_attributes ea SET auto_mapped = true
+                FROM inserted WHERE ea.id = inserted.source_id
+            )
+        """ if set_auto_mapped_flag else ''
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    WITH inserted AS (
+                        INSERT INTO mappings (
+                            source_type, destination_type, source_id, destination_id, workspace_id, created_at, updated_at
+                        )
+                        SELECT DISTINCT ON (ea.id)
+                            %(source_type)s, %(destination_type)s, ea.id, da.id, ea.workspace_id, now(), now()
+                        FROM expense_attributes ea
+                        JOIN destination_attributes da
+                            ON da.match_key = ea.match_key
+                            AND da.workspace_id = ea.workspace_id
+                            AND da.attribute_type = %(destination_type)s
+                            AND da.active IS NOT FALSE
+                        WHERE ea.workspace_id = %(workspace_id)s
+                            AND ea.attribute_type = %(source_type)s
+                            AND NOT EXISTS (SELECT 1 FROM mappings m WHERE m.source_id = ea.id)
+                            {0}
+                        ORDER BY ea.id, da.id
+                        ON CONFLICT DO NOTHING
+                        RETURNING source_id
+                    ){1}
+                    SELECT count(*) FROM inserted
+                """.format(destination_filter, flag_update), params)
+
+                return cursor.fetchone()[0]
+
+    @staticmethod
+    def auto_map_employees(destination_type: str, employee_mapping_preference: str, workspace_id: int,
+                           source_attribute_ids: List[int] = None):
+        """
+        Auto map employees
+        :param destination_type: Destination Type of mappings
+        :param employee_mapping_preference: Employee Mapping Preference
+        :param workspace_id: Workspace ID
+        :param source_attribute_ids: Only match these employees, e.g. the ids returned by an upsert, all when not given
+        """
+        employee_source_attributes = ExpenseAttribute.objects.filter(
+            attribute_type='EMPLOYEE', workspace_id=workspace_id, auto_mapped=False
+        ).only('id', 'value', 'detail')
+
+        employee_destination_attributes = DestinationAttribute.objects.filter(
+            attribute_type=destination_type, workspace_id=workspace_id).all()
+
+        if source_attribute_ids is not None:
+            # Matching only the delta against the destinations its match keys can reach
+            employee_source_attributes = list(employee_source_attributes.filter(id__in=source_attribute_ids))
+            employee_destination_attributes = filter_by_employee_match_keys(
+                employee_destination_attributes, employee_mapping_preference,
+                [get_employee_match_key(source, employee_mapping_preference) for source in employee_source_attributes]
+            )
+        else:
+            employee_source_attributes = iterate_by_keyset(employee_source_attributes)
+
+        destination_id_value_map = {}
+        for destination_employee in employee_destination_attributes:
+            value_to_be_appended = None
+            if employee_mapping_preference == 'EMAIL' and destination_employee.detail \
+                    and destination_employee.detail['email']:
+                value_to_be_appended = get_match_key(destination_employee.detail['email'])
+            elif employee_mapping_preference in ['NAME', 'EMPLOYEE_CODE']:
+                value_to_be_appended = destination_employee.match_key or get_match_key(destination_employee.value)
+
+            if value_to_be_appended:
+                destination_id_value_map[value_to_be_appended] = destination_employee.id
+
+        mapping_batch = construct_mapping_payload(
+            employee_source_attributes, employee_mapping_preference,
+            destination_id_value_map, destination_type, workspace_id
+        )
+
+        create_mappings_and_update_flag(mapping_batch)
+
+    @staticmethod
+    def auto_map_ccc_employees(destination_type: str, default_ccc_account_id: str, workspace_id: int):
+        """
+        Auto map the unmapped employees to the default ccc account, as a single INSERT ... SELECT
+        :param destination_type: Destination Type of mappings
+        :param default_ccc_account_id: Default CCC Account
+        :param workspace_id: Workspace ID
+        :return: number of mappings created
+        """
+        with connection.cursor() as cursor:
+            # Employees mapped by a concurrent sync after the snapshot hit the unique constraint and keep their mapping
+            cursor.execute("""
+                INSERT INTO mappings (
+                    source_type, destination_type, source_id, destination_id, workspace_id, created_at, updated_at
+                )
+                SELECT 'EMPLOYEE', %(destination_type)s, ea.id, da.id, ea.workspace_id, now(), now()
+                FROM expense_attributes ea
+                JOIN destination_attributes da
+                    ON da.workspace_id = ea.workspace_id
+                    AND da.attribute_type = %(destination_type)s
+                    AND da.destination_id = %(default_ccc_account_id)s
+                WHERE ea.workspace_id = %(workspace_id)s
+                    AND ea.attribute_type = 'EMPLOYEE'
+                    AND NOT EXISTS (
+                        SELECT 1 FROM mappings m
+                        WHERE m.source_id = ea.id AND m.source_type = 'EMPLOYEE'
+                            AND m.destination_type = %(destination_type)s
+                    )
+                ON CONFLICT (source_type, source_id, destination_type, workspace_id) DO NOTHING
+            """, {
+                'destination_type': destination_type,
+                'default_ccc_account_id': default_ccc_account_id,
+                'workspace_id': workspace_id
+            })
+
+            return cursor.rowcount
+
+
+class EmployeeMapping(models.Model):
+    """
+    Employee Mappings
+    """
+    id = models.AutoField(primary_key=True)
+    source_employee = models.ForeignKey(
+        ExpenseAttribute, on_delete=models.PROTECT, related_name='employeemapping', unique=True)
+    destination_employee = models.ForeignKey(
+        DestinationAttribute, on_delete=models.PROTECT, null=True, related_name='destination_employee')
+    destination_vendor = models.ForeignKey(
+        DestinationAttribute, on_delete=models.PROTECT, null=True, related_name='destination_vendor')
+    destination_card_account = models.ForeignKey(
+        DestinationAttribute, on_delete=models.PROTECT, null=True, related_name='destination_card_account')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+    updated_at = models.DateTimeField(auto_now=True, help_text='Updated at datetime')
+
+    class Meta:
+        db_table = 'employee_mappings'
+
+    @staticmethod
+    def create_or_update_employee_mapping(
+            source_employee_id: int, workspace: Workspace,
+            destination_employee_id: int = None, destination_vendor_id: int = None,
+            destination_card_account_id: int = None):
+        """
+        Create single instance of employee mappings
+        :param source_employee_id: employee expense attribute id
+        :param workspace: workspace instance
+        :param destination_employee_id: employee destination attribute id
+        :param destination_vendor_id: vendor destination attribute id
+        :param destination_card_account_id: card destination attribute id
+        :return:
+        """
+        employee_mapping, _ = EmployeeMapping.objects.update_or_create(
+            source_employee_id=source_employee_id,
+            workspace=workspace,
+            defaults={
+                'destination_employee_id': destination_employee_id,
+                'destination_vendor_id': destination_vendor_id,
+                'destination_card_account_id': destination_card_account_id
+            }
+        )
+
+        return employee_mapping
+
+    @staticmethod
+    def assign_default_card_account(destination_type: str, default_ccc_account_id: str, workspace_id: int) -> int:
+        """
+        Set the default card account on every employee without one, as a single INSERT ... SELECT
+        creating the missing employee mappings and filling the card account of the existing ones
+        :param destination_type: Destination Type of the card account, eg. CREDIT_CARD_ACCOUNT
+        :param default_ccc_account_id: Destination Id of the default card account
+        :param workspace_id: Workspace ID
+        :return: number of employee mappings created or updated
+        """
+        with connection.cursor() as cursor:
+            # The conflict WHERE is checked against the latest row version,
+            # a card account set by a concurrent sync after the snapshot is kept.
+            # Attributes sharing the destination id under other display names resolve to the first one,
+            # joining all of them would insert the same employee twice
+            cursor.execute("""
+                INSERT INTO employee_mappings (
+                    source_employee_id, destination_card_account_id, workspace_id, created_at, updated_at
+                )
+                SELECT ea.id, da.id, ea.workspace_id, now(), now()
+                FROM expense_attributes ea
+                JOIN (
+                    SELECT id FROM destination_attributes
+                    WHERE workspace_id = %(workspace_id)s
+                        AND attribute_type = %(destination_type)s
+                        AND destination_id = %(default_ccc_account_id)s
+                    ORDER BY id
+                    LIMIT 1
+                ) da ON true
+                LEFT JOIN employee_mappings em ON em.source_employee_id = ea.id
+                WHERE ea.workspace_id = %(workspace_id)s
+                    AND ea.attribute_type = 'EMPLOYEE'
+                    AND em.destination_card_account_id IS NULL
+                ON CONFLICT (source_employee_id) DO UPDATE
+                SET destination_card_account_id = EXCLUDED.destination_card_account_id, updated_at = now()
+                WHERE employee_mappings.destination_card_account_id IS NULL
+            """, {
+                'destination_type': destination_type,
+                'default_ccc_account_id': default_ccc_account_id,
+                'workspace_id': workspace_id
+            })
+
+            return cursor.rowcount
+
+
+class CategoryMapping(models.Model):
+    """
+    Category Mappings
+    """
+    id = models.AutoField(primary_key=True)
+    source_category = models.ForeignKey(ExpenseAttribute, on_delete=models.PROTECT, related_name='categorymapping')
+    destination_account = models.ForeignKey(
+        DestinationAttribute, on_delete=models.PROTECT, null=True, related_name='destination_account')
+    destination_expense_head = models.ForeignKey(
+        DestinationAttribute, on_delete=models.PROTECT, null=True, related_name='destination_expense_head')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+    updated_at = models.DateTimeField(auto_now=True, help_text='Updated at datetime')
+
+    class Meta:
+        db_table = 'category_mappings'
+
+    @staticmethod
+    def create_or_update_category_mapping(
+            source_category_id: int, workspace: Workspace,
+            destination_account_id: int = None, destination_expense_head_id: int = None):
+        """
+        Create single instance of category mappings
+        :param source_category_id: category expense attribute id
+        :param workspace: workspace instance
+        :param destination_account_id: category destination attribute id
+        :param destination_expense_head_id: expense head destination attribute id
+        :return:
+        """
+        category_mapping, _ = CategoryMapping.objects.update_or_create(
+            source_category_id=source_category_id,
+            workspace=workspace,
+            defaults={
+                'destination_account_id': destination_account_id,
+                'destination_expense_head_id': destination_expense_head_id
+            }
+        )
+
+        return category_mapping
+
+    @staticmethod
+    def bulk_create_mappings(destination_attributes: List[DestinationAttribute],
+                             destination_type: str, workspace_id: int, set_auto_mapped_flag: bool = True,
+                             fuzzy_matcher: FuzzyMatcher = None):
+        """
+        Create the bulk mapping
+        :param destination_attributes: Destination Attributes List with category mapping as null
+        :param fuzzy_matcher: Also map the categories without an exact match to their most similar destination
+        """
+        attribute_match_key_list = []
+
+        for destination_attribute in destination_attributes:
+            attribute_match_key_list.append(get_match_key(destination_attribute.value))
+
+        # Filtering unmapped Expense Attributes
+        source_attributes = ExpenseAttribute.objects.filter(
+            workspace_id=workspace_id,
+            attribute_type='CATEGORY',
+            match_key__in=attribute_match_key_list,
+            categorymapping__source_category__isnull=True
+        ).values('id', 'match_key')
+
+        source_attributes_id_map = {source_attribute['match_key']: source_attribute['id'] \
+            for source_attribute in source_attributes}
+
+        destination_field = None
+        if destination_type in ('EXPENSE_TYPE', 'EXPENSE_CATEGORY'):
+            destination_field = 'destination_expense_head_id'
+        elif destination_type == 'ACCOUNT':
+            destination_field = 'destination_account_id'
+
+        mapping_creation_batch = []
+        for destination_attribute, match_key in zip(destination_attributes, attribute_match_key_list):
+            if match_key in source_attributes_id_map:
+                mapping_creation_batch.append(
+                    CategoryMapping(
+                        source_category_id=source_attributes_id_map[match_key],
+                        workspace_id=workspace_id,
+                        **({destination_field: destination_attribute.id} if destination_field else {})
+                    )
+                )
+
+        if fuzzy_matcher:
+            mapping_creation_batch.extend(
+                CategoryMapping(
+                    source_category_id=source_id,
+                    workspace_id=workspace_id,
+                    **({destination_field: destination_id} if destination_field else {})
+                ) for source_id, destination_id in get_fuzzy_matches(
+                    fuzzy_matcher,
+                    ExpenseAttribute.objects.filter(
+                        workspace_id=workspace_id, attribute_type='CATEGORY',
+                        categorymapping__source_category__isnull=True),
+                    destination_attributes,
+                    [mapping.source_category_id for mapping in mapping_creation_batch]
+                )
+            )
+
+        return create_mappings_and_update_flag(mapping_creation_batch, set_auto_mapped_flag, model_type=CategoryMapping)
+
+    @staticmethod
+    def auto_map_categories(source_attribute_ids: List[int], destination_type: str, workspace_id: int,
+                            set_auto_mapped_flag: bool = True) -> List['CategoryMapping']:
+        """
+        Auto map a delta of categories, e.g. the ids returned by an upsert, against the destination
+        attributes their match keys can reach
+        :param source_attribute_ids: Category expense attribute ids
+        :param destination_type: Destination Type
+        :param workspace_id: Workspace ID
+        :param set_auto_mapped_flag: set auto mapped to expense attributes
+        :return: mappings list
+        """
+        match_keys = ExpenseAttribute.objects.filter(
+            id__in=source_attribute_ids,
+            workspace_id=workspace_id,
+            attribute_type='CATEGORY',
+            categorymapping__source_category__isnull=True
+        ).values_list('match_key', flat=True)
+
+        destination_attributes = DestinationAttribute.objects.filter(
+            workspace_id=workspace_id,
+            attribute_type=destination_type,
+            match_key__in=list(match_keys)
+        ).only('id', 'value')
+
+        return CategoryMapping.bulk_create_mappings(
+            list(destination_attributes), destination_type, workspace_id, set_auto_mapped_flag)
+
+    @staticmethod
+    def bulk_create_ccc_category_mappings(workspace_id: int, since: datetime = None) -> int:
+        """
+        Create Category Mappings for CCC Expenses, as a single UPDATE joining the expense heads to the accounts
+        named by their gl_account_no, falling back to their account_internal_id, ignoring case
+        :param workspace_id: Workspace ID
+        :param since: Only touch mappings whose mapping, expense head or account changed after this datetime
+        :return: number of category mappings updated
+        """
+        params = {'workspace_id': workspace_id, 'since': since}
+        since_filter = """
+            AND (cm.updated_at > %(since)s OR head.updated_at > %(since)s OR account.updated_at > %(since)s)
+        """ if since else ''
+
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                UPDATE category_mappings
+                SET destination_account_id = matched.account_id, updated_at = now()
+                FROM (
+                    SELECT DISTINCT ON (cm.id) cm.id, account.id AS account_id
+                    FROM category_mappings cm
+                    JOIN destination_attributes head ON head.id = cm.destination_expense_head_id
+                    JOIN destination_attributes account
+                        ON account.workspace_id = cm.workspace_id
+                        AND account.attribute_type = 'ACCOUNT'
+                        AND lower(account.destination_id) IN (
+                            lower(NULLIF(head.detail->>'gl_account_no', '')),
+                            lower(NULLIF(head.detail->>'account_internal_id', ''))
+                        )
+                    WHERE cm.workspace_id = %(workspace_id)s
+                        AND cm.destination_account_id IS NULL
+                        {0}
+                    ORDER BY cm.id, lower(account.destination_id) = lower(NULLIF(head.detail->>'gl_account_no', '')) DESC
+                ) matched
+                WHERE category_mappings.id = matched.id
+            """.format(since_filter), params)
+
+            return cursor.rowcount
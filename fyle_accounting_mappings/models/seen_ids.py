@@ -0,0 +1,76 @@
+from typing import List
+from django.db import models
+from django.contrib.postgres.fields import ArrayField
+
+from .workspace import Workspace
+
+
+class ExpenseAttributesSeenIds(models.Model):
+    """
+    Source ids seen during a sync of an attribute type, one row per fetched page so appends never rewrite earlier pages
+    """
+    id = models.AutoField(primary_key=True)
+    attribute_type = models.CharField(max_length=255, help_text='Type of expense attribute')
+    sync_run_id = models.CharField(max_length=255, default='', help_text='Identifier of the sync run')
+    source_ids = ArrayField(base_field=models.CharField(max_length=255), help_text='Fyle IDs seen in the page')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+
+    class Meta:
+        db_table = 'expense_attributes_seen_ids'
+        indexes = [
+            models.Index(fields=['workspace', 'attribute_type', 'sync_run_id'])
+        ]
+
+    @staticmethod
+    def append_source_ids(attribute_type: str, workspace_id: int, source_ids: List[str], sync_run_id: str = ''):
+        """
+        Record the source ids of a fetched page
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param source_ids: Fyle IDs in the page
+        :param sync_run_id: Identifier of the sync run
+        """
+        if source_ids:
+            ExpenseAttributesSeenIds.objects.create(
+                attribute_type=attribute_type,
+                workspace_id=workspace_id,
+                source_ids=list(source_ids),
+                sync_run_id=sync_run_id
+            )
+
+
+class DestinationAttributesSeenIds(models.Model):
+    """
+    Destination ids seen during a full sync of an attribute type, one row per fetched page
+    """
+    id = models.AutoField(primary_key=True)
+    attribute_type = models.CharField(max_length=255, help_text='Type of destination attribute')
+    sync_run_id = models.CharField(max_length=255, default='', help_text='Identifier of the sync run')
+    destination_ids = ArrayField(base_field=models.CharField(max_length=255), help_text='Destination IDs seen in the page')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+
+    class Meta:
+        db_table = 'destination_attributes_seen_ids'
+        indexes = [
+            models.Index(fields=['workspace', 'attribute_type', 'sync_run_id'])
+        ]
+
+    @staticmethod
+    def append_destination_ids(attribute_type: str, workspace_id: int, destination_ids: List[str],
+                               sync_run_id: str = ''):
+        """
+        Record the destination ids of a fetched page
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param destination_ids: Destination IDs in the page
+        :param sync_run_id: Identifier of the sync run
+        """
+        if destination_ids:
+            DestinationAttributesSeenIds.objects.create(
+                attribute_type=attribute_type,
+                workspace_id=workspace_id,
+                destination_ids=list(destination_ids),
+                sync_run_id=sync_run_id
+            )
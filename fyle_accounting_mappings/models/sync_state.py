@@ -0,0 +1,129 @@
+from typing import Dict, Iterable
+from datetime import datetime
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..upsert import iterate_windows
+
+from .attributes import DestinationAttribute, ExpenseAttribute
+from .seen_ids import DestinationAttributesSeenIds, ExpenseAttributesSeenIds
+from .workspace import Workspace
+
+
+class AttributeSyncState(models.Model):
+    """
+    Sync watermark of an attribute type in a workspace
+    """
+    id = models.AutoField(primary_key=True)
+    attribute_type = models.CharField(max_length=255, help_text='Type of the synced attribute')
+    is_destination = models.BooleanField(
+        default=False, help_text='Destination attribute sync if true, Fyle expense attribute sync otherwise')
+    last_synced_at = models.DateTimeField(null=True, help_text='Start of the last successful sync')
+    cursor = models.CharField(max_length=255, null=True, help_text='Source system cursor of the last successful sync')
+    rows_created = models.IntegerField(default=0, help_text='Rows created by the last successful sync')
+    rows_updated = models.IntegerField(default=0, help_text='Rows updated by the last successful sync')
+    workspace = models.ForeignKey(Workspace, on_delete=models.PROTECT, help_text='Reference to Workspace model')
+    created_at = models.DateTimeField(auto_now_add=True, help_text='Created at datetime')
+    updated_at = models.DateTimeField(auto_now=True, help_text='Updated at datetime')
+
+    class Meta:
+        db_table = 'attribute_sync_states'
+        unique_together = ('workspace', 'attribute_type', 'is_destination')
+
+    @staticmethod
+    def get_last_synced_at(attribute_type: str, workspace_id: int, is_destination: bool = False) -> datetime:
+        """
+        Get last synced at datetime of an attribute type
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param is_destination: Destination attribute sync or Fyle expense attribute sync
+        :return: last_synced_at datetime, None if never synced
+        """
+        return AttributeSyncState.objects.filter(
+            workspace_id=workspace_id, attribute_type=attribute_type, is_destination=is_destination
+        ).values_list('last_synced_at', flat=True).first()
+
+    @staticmethod
+    def get_last_synced_at_map(workspace_id: int, is_destination: bool = False) -> Dict[str, datetime]:
+        """
+        Get last synced at datetime of every attribute type of a workspace
+        :param workspace_id: Workspace Id
+        :param is_destination: Destination attribute syncs or Fyle expense attribute syncs
+        :return: {<attribute_type>: last_synced_at}
+        """
+        return dict(
+            AttributeSyncState.objects.filter(
+                workspace_id=workspace_id, is_destination=is_destination
+            ).values_list('attribute_type', 'last_synced_at')
+        )
+
+    @staticmethod
+    def upsert_delta(attributes: Iterable[Dict], attribute_type: str, workspace_id: int,
+                     is_destination: bool = False, synced_at: datetime = None, cursor: str = None,
+                     update: bool = True, **kwargs) -> Dict[str, int]:
+        """
+        Upsert the attributes changed since the last sync and move the watermark forward.
+        Callers fetch from the source system with get_last_synced_at as the lower bound, attributes carrying
+        an 'updated_at' at or before the watermark are skipped. The watermark only moves when every window is upserted.
+        With a sync_run_id the ids of every fetched attribute are recorded, skipped ones included,
+        so the deletion sweep of the run does not mark unchanged attributes inactive.
+        :param attributes: Iterable / generator of attribute dicts
+        :param attribute_type: Attribute type
+        :param workspace_id: Workspace Id
+        :param is_destination: Upsert destination attributes or Fyle expense attributes
+        :param synced_at: Time the fetch from the source system started, defaults to now
+        :param cursor: Source system cursor to store with the watermark
+        :param update: Update Pre-existing records or not
+        :param kwargs: Extra arguments of stream_upsert_expense_attributes / stream_upsert_destination_attributes,
+            eg. sync_run_id or window_size
+        :return: {'created': <count>, 'updated': <count>}
+        """
+        # The seen ids are recorded here, before the unchanged attributes are filtered out
+        sync_run_id = kwargs.pop('sync_run_id', None)
+        window_size = kwargs.get('window_size', 1000)
+        synced_at = synced_at or timezone.now()
+        last_synced_at = AttributeSyncState.get_last_synced_at(attribute_type, workspace_id, is_destination)
+        if last_synced_at and timezone.is_naive(last_synced_at):
+            last_synced_at = timezone.make_aware(last_synced_at)
+
+        def changed_attributes():
+            for window in iterate_windows(attributes, window_size):
+                if sync_run_id is not None and is_destination:
+                    DestinationAttributesSeenIds.append_destination_ids(
+                        attribute_type, workspace_id, [attribute['destination_id'] for attribute in window], sync_run_id)
+                elif sync_run_id is not None:
+                    ExpenseAttributesSeenIds.append_source_ids(
+                        attribute_type, workspace_id, [attribute['source_id'] for attribute in window], sync_run_id)
+
+                for attribute in window:
+                    updated_at = attribute['updated_at'] if 'updated_at' in attribute else None
+                    if isinstance(updated_at, str):
+                        updated_at = parse_datetime(updated_at)
+                    if updated_at and timezone.is_naive(updated_at):
+                        updated_at = timezone.make_aware(updated_at)
+
+                    if last_synced_at and updated_at and updated_at <= last_synced_at:
+                        continue
+                    yield attribute
+
+        if is_destination:
+            counts = DestinationAttribute.stream_upsert_destination_attributes(
+                changed_attributes(), attribute_type, workspace_id, update, **kwargs)
+        else:
+            counts = ExpenseAttribute.stream_upsert_expense_attributes(
+                changed_attributes(), attribute_type, workspace_id, update, **kwargs)
+
+        AttributeSyncState.objects.update_or_create(
+            workspace_id=workspace_id,
+            attribute_type=attribute_type,
+            is_destination=is_destination,
+            defaults={
+                'last_synced_at': synced_at,
+                'cursor': cursor,
+                'rows_created': counts['created'],
+                'rows_updated': counts['updated']
+            }
+        )
+
+        return counts
@@ -0,0 +1,4 @@
+import importlib
+
+workspace_models = importlib.import_module("apps.workspaces.models")
+Workspace = workspace_models.Workspace
@@ -0,0 +1,262 @@
+"""
+Mapping rules engine, compiles the rules of a workspace into one matcher and maps the unmapped
+source attributes that match them in a single pass
+
+mappings = apply_mapping_rules('PROJECT', 'CUSTOMER', workspace_id)
+"""
+import logging
+import re
+from collections import deque
+from typing import Iterable, List
+
+from .models import CategoryMapping, ExpenseAttribute, Mapping, MappingRule, create_mappings_and_update_flag, \
+    get_match_key
+from .utils import assert_valid, iterate_by_keyset
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixTrie:
+    """
+    Character trie of the PREFIX rules, each node keeps the best rule ending on it
+    """
+    def __init__(self):
+        self.children = [{}]
+        self.rule_indexes = [None]
+
+    def add(self, pattern: str, rule_index: int) -> None:
+        """
+        Add a prefix
+        :param pattern: Lower cased prefix
+        :param rule_index: Position of the rule in priority order
+        """
+        node = 0
+        for character in pattern:
+            if character not in self.children[node]:
+                self.children.append({})
+                self.rule_indexes.append(None)
+                self.children[node][character] = len(self.children) - 1
+            node = self.children[node][character]
+
+        if self.rule_indexes[node] is None or rule_index < self.rule_indexes[node]:
+            self.rule_indexes[node] = rule_index
+
+    def match(self, value: str) -> int:
+        """
+        Best rule among the prefixes of a value
+        :param value: Lower cased value
+        :return: rule index or None
+        """
+        best = self.rule_indexes[0]
+        node = 0
+        for character in value:
+            node = self.children[node].get(character)
+            if node is None:
+                break
+            rule_index = self.rule_indexes[node]
+            if rule_index is not None and (best is None or rule_index < best):
+                best = rule_index
+
+        return best
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton of the CONTAINS rules, finds the best rule among all the patterns
+    contained in a value with one scan of the value
+    """
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.rule_indexes = [None]
+
+    def add(self, pattern: str, rule_index: int) -> None:
+        """
+        Add a substring, build() must be called once every pattern is added
+        :param pattern: Lower cased substring
+        :param rule_index: Position of the rule in priority order
+        """
+        node = 0
+        for character in pattern:
+            if character not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.rule_indexes.append(None)
+                self.goto[node][character] = len(self.goto) - 1
+            node = self.goto[node][character]
+
+        if self.rule_indexes[node] is None or rule_index < self.rule_indexes[node]:
+            self.rule_indexes[node] = rule_index
+
+    def build(self) -> None:
+        """
+        Set the failure links breadth first, folding the best rule of each failure chain into its node
+        """
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for character, child in self.goto[node].items():
+                queue.append(child)
+
+                if node:
+                    fail = self.fail[node]
+                    while fail and character not in self.goto[fail]:
+                        fail = self.fail[fail]
+                    self.fail[child] = self.goto[fail].get(character, 0)
+
+                inherited = self.rule_indexes[self.fail[child]]
+                if inherited is not None and (self.rule_indexes[child] is None or inherited < self.rule_indexes[child]):
+                    self.rule_indexes[child] = inherited
+
+    def match(self, value: str) -> int:
+        """
+        Best rule among the patterns contained in a value
+        :param value: Lower cased value
+        :return: rule index or None
+        """
+        best = self.rule_indexes[0]
+        node = 0
+        for character in value:
+            while node and character not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(character, 0)
+
+            rule_index = self.rule_indexes[node]
+            if rule_index is not None and (best is None or rule_index < best):
+                best = rule_index
+
+        return best
+
+
+class CompiledRules:
+    """
+    Rules of a workspace compiled into one matcher, the first rule in (priority, id) order wins.
+    Matching ignores case, EXACT rules compare match keys.
+    """
+    def __init__(self, rules: Iterable[MappingRule]):
+        """
+        Initialize the CompiledRules class.
+        :param rules: Mapping rules
+        """
+        self.rules = sorted(rules, key=lambda rule: (rule.priority, rule.id))
+        self.exact = {}
+        self.prefixes = PrefixTrie()
+        self.substrings = AhoCorasick()
+        self.regexes = []
+
+        for rule_index, rule in enumerate(self.rules):
+            if rule.rule_type == 'EXACT':
+                self.exact.setdefault(get_match_key(rule.pattern), rule_index)
+            elif rule.rule_type == 'PREFIX':
+                self.prefixes.add(rule.pattern.lower(), rule_index)
+            elif rule.rule_type == 'CONTAINS':
+                self.substrings.add(rule.pattern.lower(), rule_index)
+            elif rule.rule_type == 'REGEX':
+                try:
+                    self.regexes.append((rule_index, re.compile(rule.pattern, re.IGNORECASE)))
+                except re.error as exception:
+                    logger.info('Skipping mapping rule %s with an invalid pattern - %s', rule.id, exception)
+
+        self.substrings.build()
+
+    def match(self, value: str) -> MappingRule:
+        """
+        Best rule matching a value
+        :param value: Source attribute value
+        :return: mapping rule or None
+        """
+        if not value:
+            return None
+
+        lower_value = value.lower()
+        candidates = [
+            self.exact.get(get_match_key(value)),
+            self.prefixes.match(lower_value),
+            self.substrings.match(lower_value)
+        ]
+        best = min((rule_index for rule_index in candidates if rule_index is not None), default=None)
+
+        for rule_index, regex in self.regexes:
+            if best is not None and rule_index >= best:
+                break
+            if regex.search(value):
+                best = rule_index
+                break
+
+        return self.rules[best] if best is not None else None
+
+
+def get_category_destination_field(destination_type: str) -> str:
+    """
+    Get the category mapping field a destination type is written to
+    :param destination_type: Destination Type, EXPENSE_TYPE, EXPENSE_CATEGORY or ACCOUNT
+    :return: field name
+    """
+    assert_valid(
+        destination_type in ('EXPENSE_TYPE', 'EXPENSE_CATEGORY', 'ACCOUNT'),
+        'Category mappings cannot map to destination type {0}'.format(destination_type)
+    )
+
+    if destination_type in ('EXPENSE_TYPE', 'EXPENSE_CATEGORY'):
+        return 'destination_expense_head_id'
+
+    return 'destination_account_id'
+
+
+def apply_mapping_rules(source_type: str, destination_type: str, workspace_id: int, model_type=Mapping,
+                        set_auto_mapped_flag: bool = True) -> List:
+    """
+    Map the unmapped source attributes matching the enabled rules of a workspace
+    :param source_type: Source Type, eg. PROJECT
+    :param destination_type: Destination Type, the rules pointing at other destination types are ignored
+    :param workspace_id: Workspace Id
+    :param model_type: Mapping or CategoryMapping
+    :param set_auto_mapped_flag: set auto mapped to expense attributes
+    :return: created mappings
+    """
+    destination_field = get_category_destination_field(destination_type) if model_type == CategoryMapping else None
+
+    compiled_rules = CompiledRules(
+        MappingRule.objects.filter(
+            workspace_id=workspace_id,
+            source_type=source_type,
+            destination__attribute_type=destination_type,
+            is_enabled=True
+        ).only('id', 'rule_type', 'pattern', 'priority', 'destination_id')
+    )
+    if not compiled_rules.rules:
+        return []
+
+    source_attributes = ExpenseAttribute.objects.filter(workspace_id=workspace_id, attribute_type=source_type)
+    if model_type == CategoryMapping:
+        source_attributes = source_attributes.filter(categorymapping__source_category__isnull=True)
+    else:
+        source_attributes = source_attributes.filter(mapping__source_id__isnull=True)
+
+    mapping_batch = []
+    for source_attribute in iterate_by_keyset(source_attributes.values('id', 'value'), page_size=1000):
+        rule = compiled_rules.match(source_attribute['value'])
+        if rule is None:
+            continue
+
+        if model_type == CategoryMapping:
+            mapping_batch.append(
+                CategoryMapping(
+                    source_category_id=source_attribute['id'],
+                    workspace_id=workspace_id,
+                    **{destination_field: rule.destination_id}
+                )
+            )
+        else:
+            mapping_batch.append(
+                Mapping(
+                    source_type=source_type,
+                    destination_type=destination_type,
+                    source_id=source_attribute['id'],
+                    destination_id=rule.destination_id,
+                    workspace_id=workspace_id
+                )
+            )
+
+    return create_mappings_and_update_flag(mapping_batch, set_auto_mapped_flag, model_type=model_type)
@@ -0,0 +1,195 @@
+"""
+Multi workspace sync scheduler
+"""
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict
+
+import django
+from django.apps import apps
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+# First key of the two key advisory locks, keeps workspace locks apart from other advisory lock users
+WORKSPACE_LOCK_NAMESPACE = 7130
+
+
+def count_rows(result) -> int:
+    """
+    Count the rows written by a library entry point from its return value
+    :param result: Return value of the entry point
+    :return: number of rows
+    """
+    if isinstance(result, bool) or result is None:
+        return 0
+    if isinstance(result, int):
+        return result
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, dict):
+        rows = 0
+        for key in ('created', 'updated', 'rows_copied'):
+            if isinstance(result.get(key), int):
+                rows += result[key]
+        for key in ('created_ids', 'updated_ids'):
+            if isinstance(result.get(key), list):
+                rows += len(result[key])
+        return rows
+    return 0
+
+
+def run_workspace_task(workspace_id: int, function: Callable, args: tuple, kwargs: dict,
+                       lock_retry_seconds: float) -> (str, int):
+    """
+    Run a task while holding the advisory lock of its workspace
+    :param workspace_id: Workspace Id
+    :param function: Library entry point
+    :param args: Positional arguments of the entry point
+    :param kwargs: Keyword arguments of the entry point
+    :param lock_retry_seconds: Wait before reporting the workspace as locked by another worker
+    :return: status, rows written
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_lock(%s, %s)', [WORKSPACE_LOCK_NAMESPACE, workspace_id])
+            if not cursor.fetchone()[0]:
+                time.sleep(lock_retry_seconds)
+                return 'LOCKED', 0
+
+        try:
+            return 'COMPLETE', count_rows(function(*args, **kwargs))
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s, %s)', [WORKSPACE_LOCK_NAMESPACE, workspace_id])
+    finally:
+        # Pool threads outlive the task, their connections are not closed by the request cycle
+        connection.close()
+
+
+def initialize_worker_process():
+    """
+    Set up django in a pool process started with spawn
+    """
+    if not apps.ready:
+        django.setup()
+
+
+class WorkspaceSyncScheduler:
+    """
+    Runs library entry points across workspaces on a thread or process pool.
+    Workspaces are served round robin with at most one task in flight each, so a workspace with many
+    queued tasks cannot starve the others, and a postgres advisory lock keeps other schedulers out.
+
+    scheduler = WorkspaceSyncScheduler(max_workers=8)
+    scheduler.submit(1, ExpenseAttribute.bulk_upsert_expense_attributes, attributes, 'PROJECT', 1)
+    scheduler.submit(1, Mapping.auto_map_employees, 'EMPLOYEE', 'EMAIL', 1)
+    stats = scheduler.run()
+    """
+    def __init__(self, max_workers: int = 4, use_processes: bool = False, lock_retry_seconds: float = 1.0,
+                 max_lock_retries: int = 60):
+        """
+        Initialize the WorkspaceSyncScheduler class.
+        :param max_workers: Pool size
+        :param use_processes: Use a process pool instead of a thread pool, tasks and arguments must be picklable
+        :param lock_retry_seconds: Wait before a task locked by another worker is queued again
+        :param max_lock_retries: Attempts before a task locked by another worker is dropped
+        """
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.lock_retry_seconds = lock_retry_seconds
+        self.max_lock_retries = max_lock_retries
+        self.queues = OrderedDict()
+
+    def submit(self, workspace_id: int, function: Callable, *args, **kwargs) -> None:
+        """
+        Queue a task of a workspace, tasks of a workspace run in submission order
+        :param workspace_id: Workspace Id
+        :param function: Library entry point
+        :param args: Positional arguments of the entry point
+        :param kwargs: Keyword arguments of the entry point
+        """
+        self.queues.setdefault(workspace_id, deque()).append((function, args, kwargs, 0))
+
+    def get_pool(self):
+        """
+        Get the worker pool
+        :return: executor
+        """
+        if self.use_processes:
+            # Forked processes must not share the parent's database sockets
+            connections.close_all()
+            return ProcessPoolExecutor(max_workers=self.max_workers, initializer=initialize_worker_process)
+
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def run(self) -> Dict:
+        """
+        Run every queued task
+        :return: throughput stats
+        """
+        stats = {'workspaces': 0, 'tasks': 0, 'failed': 0, 'dropped': 0, 'rows': 0}
+        completed_workspaces = set()
+        in_flight = {}
+        start = time.monotonic()
+
+        with self.get_pool() as pool:
+            while self.queues or in_flight:
+                busy_workspaces = {workspace_id for workspace_id, _ in in_flight.values()}
+
+                for workspace_id in list(self.queues.keys()):
+                    if len(in_flight) >= self.max_workers:
+                        break
+                    if workspace_id in busy_workspaces:
+                        continue
+
+                    queue = self.queues.pop(workspace_id)
+                    task = queue.popleft()
+                    if queue:
+                        # Re-inserting moves the workspace to the back of the round robin
+                        self.queues[workspace_id] = queue
+
+                    function, args, kwargs, _ = task
+                    future = pool.submit(
+                        run_workspace_task, workspace_id, function, args, kwargs, self.lock_retry_seconds
+                    )
+                    in_flight[future] = (workspace_id, task)
+                    busy_workspaces.add(workspace_id)
+
+                done, _ = wait(list(in_flight.keys()), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    workspace_id, task = in_flight.pop(future)
+
+                    try:
+                        status, rows = future.result()
+                    except Exception as exception:
+                        stats['failed'] += 1
+                        logger.exception('Sync task failed for workspace_id %s - %s', workspace_id, exception)
+                        continue
+
+                    if status == 'LOCKED':
+                        function, args, kwargs, retries = task
+                        if retries + 1 >= self.max_lock_retries:
+                            stats['dropped'] += 1
+                            logger.info('Dropping sync task of locked workspace_id %s', workspace_id)
+                        else:
+                            self.queues.setdefault(workspace_id, deque()).appendleft(
+                                (function, args, kwargs, retries + 1))
+                        continue
+
+                    stats['tasks'] += 1
+                    stats['rows'] += rows
+                    completed_workspaces.add(workspace_id)
+
+        seconds = time.monotonic() - start
+        stats['workspaces'] = len(completed_workspaces)
+        stats['seconds'] = seconds
+        stats['workspaces_per_minute'] = stats['workspaces'] * 60 / seconds if seconds else 0
+        stats['rows_per_second'] = stats['rows'] / seconds if seconds else 0
+
+        logger.info('Workspace syncs completed - %s', stats)
+
+        return stats
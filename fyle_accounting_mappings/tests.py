@@ -0,0 +1,75 @@
+from django.test import TestCase
+
+from .helpers import EmployeesAutoMappingHelper
+from .models import DestinationAttribute, EmployeeMapping, ExpenseAttribute, Mapping, Workspace, \
+    get_existing_source_ids
+
+
+class ExistingMappingsQueryTestCase(TestCase):
+    """
+    Lookups of existing mappings run in a single query, however many mappings the workspace has
+    """
+    mapping_counts = (5, 50)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.workspaces = {}
+        cls.source_attributes = {}
+
+        for mapping_count in cls.mapping_counts:
+            workspace = Workspace.objects.create(name='Test Workspace {0}'.format(mapping_count))
+            attribute_count = mapping_count * 2
+
+            ExpenseAttribute.objects.bulk_create([
+                ExpenseAttribute(
+                    attribute_type='EMPLOYEE', display_name='Employee', value='employee{0}@fyle.in'.format(index),
+                    source_id='ou{0}'.format(index), workspace=workspace
+                ) for index in range(attribute_count)
+            ])
+            DestinationAttribute.objects.bulk_create([
+                DestinationAttribute(
+                    attribute_type='VENDOR', display_name='Vendor', value='Vendor {0}'.format(index),
+                    destination_id='v{0}'.format(index), workspace=workspace
+                ) for index in range(attribute_count)
+            ])
+
+            source_attributes = list(ExpenseAttribute.objects.filter(workspace=workspace).order_by('id'))
+            destination_attributes = list(DestinationAttribute.objects.filter(workspace=workspace).order_by('id'))
+
+            Mapping.objects.bulk_create([
+                Mapping(
+                    source_type='EMPLOYEE', destination_type='VENDOR', source=source_attribute,
+                    destination=destination_attribute, workspace=workspace
+                ) for source_attribute, destination_attribute in zip(
+                    source_attributes[:mapping_count], destination_attributes[:mapping_count])
+            ])
+            EmployeeMapping.objects.bulk_create([
+                EmployeeMapping(
+                    source_employee=source_attribute, destination_vendor=destination_attribute, workspace=workspace
+                ) for source_attribute, destination_attribute in zip(source_attributes, destination_attributes)
+            ])
+
+            cls.workspaces[mapping_count] = workspace
+            cls.source_attributes[mapping_count] = source_attributes
+
+    def test_get_existing_source_ids(self):
+        for mapping_count in self.mapping_counts:
+            with self.subTest(mapping_count=mapping_count):
+                with self.assertNumQueries(1):
+                    source_ids = get_existing_source_ids('VENDOR', self.workspaces[mapping_count].id)
+
+                self.assertEqual(source_ids, {
+                    source_attribute.id for source_attribute in self.source_attributes[mapping_count][:mapping_count]
+                })
+
+    def test_construct_existing_employee_mappings_map(self):
+        for mapping_count in self.mapping_counts:
+            with self.subTest(mapping_count=mapping_count):
+                helper = EmployeesAutoMappingHelper(self.workspaces[mapping_count].id, 'VENDOR', 'EMAIL')
+
+                with self.assertNumQueries(1):
+                    existing_employee_mappings_map = helper.construct_existing_employee_mappings_map()
+
+                self.assertEqual(set(existing_employee_mappings_map), {
+                    source_attribute.id for source_attribute in self.source_attributes[mapping_count]
+                })
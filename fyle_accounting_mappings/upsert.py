@@ -0,0 +1,173 @@
+"""
+Postgres native upsert helpers
+"""
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.db import connection
+
+from .executor import BulkWriteExecutor
+
+
+def get_conflict_fields(model) -> List[str]:
+    """
+    Get the field names of the unique constraint an upsert conflicts on
+    :param model: Django model class
+    :return: field names from the model's unique_together
+    """
+    return list(model._meta.unique_together[0])
+
+
+def build_upsert_statement(model, rows: List[Dict], conflict_fields: List[str], update_fields: List[str],
+                           update: bool = True, change_fields: List[str] = None,
+                           returning_fields: List[str] = None) -> Tuple[str, list]:
+    """
+    Build a single INSERT ... ON CONFLICT statement for a batch of rows
+    :param model: Django model class
+    :param rows: rows = [{<field name>: <value>}], every row having the same keys
+    :param conflict_fields: Field names of the unique constraint to conflict on, a plain INSERT when empty
+    :param update_fields: Field names to overwrite on conflict when they changed
+    :param update: Update pre-existing records or leave them untouched
+    :param change_fields: Field names compared to decide whether a row changed, defaults to update_fields
+    :param returning_fields: Field names returned after the primary key and the created flag
+    :return: sql, params
+    """
+    meta = model._meta
+    quote_name = connection.ops.quote_name
+
+    fields = [meta.get_field(field_name) for field_name in rows[0].keys()]
+    timestamp_fields = [
+        field for field in meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    # Django applies model defaults in python, the columns have no database default
+    default_fields = [
+        field for field in meta.concrete_fields
+        if field.has_default() and field not in fields and field not in timestamp_fields and not field.primary_key
+    ]
+
+    columns = [quote_name(field.column) for field in fields + default_fields + timestamp_fields]
+    row_placeholder = '({0})'.format(
+        ', '.join(['%s'] * (len(fields) + len(default_fields)) + ['now()'] * len(timestamp_fields))
+    )
+
+    defaults = [field.get_db_prep_save(field.get_default(), connection) for field in default_fields]
+
+    params = []
+    for row in rows:
+        for field in fields:
+            params.append(field.get_db_prep_save(row[field.name], connection))
+        params.extend(defaults)
+
+    conflict_columns = ', '.join(quote_name(meta.get_field(field_name).column) for field_name in conflict_fields)
+
+    if not conflict_fields:
+        conflict_clause = ''
+    elif update and update_fields:
+        update_columns = [quote_name(meta.get_field(field_name).column) for field_name in update_fields]
+        assignments = ['{0} = EXCLUDED.{0}'.format(column) for column in update_columns]
+        assignments.extend(
+            '{0} = now()'.format(quote_name(field.column)) for field in timestamp_fields if field.auto_now
+        )
+        change_columns = [
+            quote_name(meta.get_field(field_name).column) for field_name in (change_fields or update_fields)
+        ]
+        changed = ' OR '.join('t.{0} IS DISTINCT FROM EXCLUDED.{0}'.format(column) for column in change_columns)
+        conflict_clause = 'ON CONFLICT ({0}) DO UPDATE SET {1} WHERE {2} '.format(
+            conflict_columns, ', '.join(assignments), changed)
+    else:
+        conflict_clause = 'ON CONFLICT ({0}) DO NOTHING '.format(conflict_columns)
+
+    returning_columns = ''.join(
+        ', t.{0}'.format(quote_name(meta.get_field(field_name).column)) for field_name in (returning_fields or [])
+    )
+
+    sql = 'INSERT INTO {table} AS t ({columns}) VALUES {values} {conflict_clause}' \
+        'RETURNING t.{pk}, (t.xmax = 0) AS created{returning_columns}'.format(
+            table=quote_name(meta.db_table),
+            columns=', '.join(columns),
+            values=', '.join([row_placeholder] * len(rows)),
+            conflict_clause=conflict_clause,
+            pk=quote_name(meta.pk.column),
+            returning_columns=returning_columns
+        )
+
+    return sql, params
+
+
+def bulk_upsert(model, rows: List[Dict], update_fields: List[str], update: bool = True,
+                conflict_fields: List[str] = None, change_fields: List[str] = None,
+                executor: BulkWriteExecutor = None) -> Dict[str, List[int]]:
+    """
+    Insert rows and update the pre-existing ones that changed, in one statement per batch.
+    Rows must already be unique on the conflict fields, postgres cannot touch a row twice in a statement.
+    :param model: Django model class
+    :param rows: rows = [{<field name>: <value>}], every row having the same keys
+    :param update_fields: Field names to overwrite on conflict when they changed
+    :param update: Update pre-existing records or leave them untouched
+    :param conflict_fields: Field names to conflict on, defaults to the model's unique_together
+    :param change_fields: Field names compared to decide whether a row changed, defaults to update_fields
+    :param executor: Executor to run the statements in, a new one is used when not given
+    :return: {'created_ids': [...], 'updated_ids': [...]}
+    """
+    conflict_fields = conflict_fields or get_conflict_fields(model)
+    label = 'upsert:{0}'.format(model._meta.db_table)
+
+    def write_batch(batch: List[Dict]) -> list:
+        sql, params = build_upsert_statement(model, batch, conflict_fields, update_fields, update, change_fields)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    if executor:
+        results = executor.run(label, rows, write_batch)
+    else:
+        with BulkWriteExecutor() as executor:
+            results = executor.run(label, rows, write_batch)
+
+    created_ids = []
+    updated_ids = []
+
+    for primary_key, created in results:
+        if created:
+            created_ids.append(primary_key)
+        else:
+            updated_ids.append(primary_key)
+
+    return {
+        'created_ids': created_ids,
+        'updated_ids': updated_ids
+    }
+
+
+def iterate_windows(items: Iterable, window_size: int) -> Iterator[list]:
+    """
+    Consume an iterable in fixed size windows without materializing it
+    :param items: Any iterable, e.g. a generator over a paginated API
+    :param window_size: Items per window
+    :return: iterator of lists of at most window_size items
+    """
+    iterator = iter(items)
+    window = list(islice(iterator, window_size))
+
+    while window:
+        yield window
+        window = list(islice(iterator, window_size))
+
+
+def get_unique_attributes(attributes: Iterable[Dict], key: str, update: bool = True) -> Dict[str, Dict]:
+    """
+    Dedupe attribute dicts on a key the way the upsert resolves repeats across batches,
+    the last occurrence wins when update is True and the first one when update is False
+    :param attributes: Attribute dicts
+    :param key: Key the attributes conflict on, eg. value or destination_id
+    :param update: Update Pre-existing records or not
+    :return: {<key>: <attribute>}, in the order the keys were first seen
+    """
+    unique_attributes = {}
+
+    for attribute in attributes:
+        if update or attribute[key] not in unique_attributes:
+            unique_attributes[attribute[key]] = attribute
+
+    return unique_attributes
@@ -1,7 +1,7 @@
 from rest_framework.views import Response
 from rest_framework.serializers import ValidationError
 from rest_framework.filters import BaseFilterBackend
-from django.db.models import Q
+from django.db.models import Q, QuerySet
 
 
 def assert_valid(condition: bool, message: str) -> Response or None:
@@ -17,6 +17,27 @@ def assert_valid(condition: bool, message: str) -> Response or None:
         })
 
 
+def iterate_by_keyset(queryset: QuerySet, page_size: int = 200):
+    """
+    Iterate a queryset in pages of id > last seen id, so each page is an index range scan
+    and rows written between pages do not shift the window
+    :param queryset: Queryset to iterate
+    :param page_size: Rows fetched per query
+    :return: iterator of the queryset's rows in id order
+    """
+    last_id = 0
+
+    while True:
+        page = list(queryset.filter(id__gt=last_id).order_by('id')[:page_size])
+        if not page:
+            return
+
+        yield from page
+
+        last_row = page[-1]
+        last_id = last_row['id'] if isinstance(last_row, dict) else last_row.id
+
+
 class LookupFieldMixin:
     lookup_field = 'workspace_id'
 
@@ -19,6 +19,7 @@ setuptools.setup(
     url='https://github.com/fylein/fyle-accounting-mappings',
     packages=setuptools.find_packages(),
     install_requires=['django>=3.0.2', 'django-rest-framework>=0.1.0'],
+    extras_require={'async': ['psycopg>=3.1']},
     include_package_data=True,
     classifiers=[
         'Framework :: Django',